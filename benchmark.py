@@ -0,0 +1,291 @@
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from html import escape
+
+import generate_site
+from matrix_engine import engine_name
+from rank_parser import RaceMatcher, parse_ranking
+from scrap_classement import CSV_FIELDS, DEFAULT_PAGES, SERVERS
+
+try:
+    import resource
+except ImportError:  # Windows : pas de mémoire maximale dans le rapport
+    resource = None
+
+# =====================
+# BENCHMARK
+# =====================
+# Historique synthétique (N années de relevés quotidiens sur les six
+# serveurs, avec arrivées/départs de joueurs et changements de race), puis
+# chronométrage de chaque étape séparément. Le résultat est écrit en JSON
+# pour comparer deux commits :
+#   python benchmark.py --years 3 --output bench_3y.json
+#   python benchmark.py --csv bloodwars_classement.csv --pages captures/
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, "benchmark_results.json")
+ROWS_PER_PAGE = 50
+
+# =====================
+# HISTORIQUE SYNTHÉTIQUE
+# =====================
+SYLLABLES = ["ka", "vor", "lu", "cius", "mor", "dra", "vash", "el", "thi", "zan",
+             "ś", "ł", "ré", "nyx", "oth", "ia", "bel", "grim", "ash", "ul"]
+
+def player_name(rng, taken):
+    while True:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        if rng.random() < 0.15:
+            name += f" {rng.choice(SYLLABLES)}"     # noms à plusieurs mots
+        if rng.random() < 0.1:
+            name += str(rng.randint(1, 99))
+        if name not in taken:
+            taken.add(name)
+            return name
+
+def synthetic_history(path, years=1, players=ROWS_PER_PAGE * DEFAULT_PAGES, seed=1,
+                      start=date(2024, 1, 1), churn=0.01, race_changes=0.001):
+    """Écrit un CSV au format du scraper ; renvoie le nombre de lignes
+
+    Chaque serveur garde un vivier un peu plus grand que le classement : des
+    joueurs entrent et sortent du top, d'autres arrêtent (remplacés par de
+    nouveaux noms) ou changent de race.
+    """
+    rng = random.Random(seed)
+    pools, names = {}, {}
+    for server in SERVERS:
+        taken = names[server["code"]] = set()
+        pools[server["code"]] = [
+            [player_name(rng, taken), rng.choice(server["races"]), rng.randint(10**5, 10**8)]
+            for _ in range(players + players // 5)
+        ]
+
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";", quoting=csv.QUOTE_ALL)
+        writer.writerow(CSV_FIELDS)
+        for d in range(365 * years):
+            day = (start + timedelta(days=d)).isoformat()
+            for server in SERVERS:
+                pool = pools[server["code"]]
+                taken = names[server["code"]]
+                for player in pool:
+                    if rng.random() < churn:
+                        player[:] = [player_name(rng, taken), rng.choice(server["races"]), rng.randint(10**5, 10**6)]
+                    elif rng.random() < race_changes:
+                        player[1] = rng.choice(server["races"])
+                    player[2] += int(rng.expovariate(1 / 50000))
+                ranked = sorted(pool, key=lambda p: p[2], reverse=True)[:players]
+                for position, (name, race, points) in enumerate(ranked, 1):
+                    writer.writerow([day, server["code"], position, name, race, points])
+                count += len(ranked)
+    return count
+
+def ranking_page(rows):
+    """Page ?a=rank minimale : en-tête, lignes du tableau, scripts et mise en page"""
+    out = [
+        "<html><head><script>var rank = '1. pas une ligne';</script></head><body>",
+        '<table class="menu"><tr><td>Menu</td></tr></table>',
+        '<table class="rank"><tr><th>Place</th><th>Nom</th><th>Race</th><th>Points</th></tr>',
+    ]
+    for row in rows:
+        out.append(
+            f'<tr class="even"><td>{row["position"]}.</td>'
+            f'<td><a href="?a=profile&amp;uid={row["position"]}">{escape(row["name"])}</a></td>'
+            f'<td>{escape(row["race"])}</td><td>{row["points"]}</td></tr>'
+        )
+    out.append("</table></body></html>")
+    return "".join(out)
+
+def synthetic_pages(csv_path):
+    """Pages du dernier jour du CSV : [(serveur, html)], ROWS_PER_PAGE lignes par page"""
+    with open(csv_path, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f, delimiter=";"))
+    last = rows[-1]["date"]
+    pages = []
+    for server in SERVERS:
+        day = [r for r in rows if r["date"] == last and r["server"] == server["code"]]
+        for i in range(0, len(day), ROWS_PER_PAGE):
+            pages.append((server["code"], ranking_page(day[i:i + ROWS_PER_PAGE])))
+    return pages
+
+def captured_pages(directory):
+    """Pages enregistrées dans `directory`, nommées <serveur>_<page>.html (ex. R3_2.html)"""
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".html"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                pages.append((name.split("_")[0], f.read()))
+    return pages
+
+# =====================
+# CHRONOMÉTRAGE
+# =====================
+def timed(results, stage, func, count=None):
+    """Exécute func(), note sa durée ; count(résultat) = nombre d'éléments traités"""
+    started = time.perf_counter()
+    value = func()
+    seconds = time.perf_counter() - started
+    items = count(value) if count else None
+    results[stage] = {
+        "seconds": round(seconds, 4),
+        "items": items,
+        "per_second": round(items / seconds) if items and seconds else None,
+    }
+    print(f"⏱️ {stage:<14} {seconds:>8.3f}s" + (f"  ({items} éléments)" if items else ""))
+    return value
+
+def bench_generate(csv_path, results):
+    """Étapes de generate_site.py, sans rien écrire dans le dépôt"""
+    def read():
+        state = generate_site.new_state("csv")
+        return sum(1 for _ in generate_site.translate(generate_site.read_csv_rows(state, 0, csv_path)))
+
+    def group():
+        state = generate_site.new_state("csv")
+        touched = generate_site.ingest(state, generate_site.translate(generate_site.read_csv_rows(state, 0, csv_path)))
+        state["dates"] = sorted(touched)
+        return state
+
+    # csv_ingest : lecture + traduction ; grouping : idem + agrégation dans les séries
+    timed(results, "csv_ingest", read, lambda n: n)
+    state = timed(results, "grouping", group, lambda s: len(s["players"]))
+    # Construction des matrices joueurs × dates si le moteur NumPy est actif
+    site = timed(results, "site_data", lambda: generate_site.SiteData(state))
+
+    presets = timed(results, "presets", lambda: generate_site.compute_presets(site),
+                    lambda p: sum(len(v["entries"]) for v in p.values()))
+    months = sorted({d[:7] for d in site.dates})
+    shards = timed(results, "shards", lambda: {
+        m: generate_site.dump_json(generate_site.encode_shard(generate_site.month_days(site, m)))
+        for m in months
+    }, lambda s: sum(map(len, s.values())))
+    shard_urls = {m: f"shards/{m}.json" for m in months}
+    timed(results, "manifest", lambda: generate_site.dump_json(
+        generate_site.manifest_payload(site, presets, shard_urls)), len)
+    initial = timed(results, "initial_view", lambda: generate_site.initial_view(site, presets),
+                    lambda v: len(v["rows"]))
+
+    urls = {"manifest": "data/manifest.json",
+            "worker": "assets/progression_worker.js",
+            "stylesheets": ["assets/site.css"], "scripts": ["assets/site.js"]}
+
+    def render():
+        out = io.StringIO()
+        generate_site.render(generate_site.TEMPLATE_FILE, out, generate_site.page_sections(site, presets, initial, urls))
+        return out.getvalue()
+
+    timed(results, "render_html", render, lambda html: len(html.encode("utf-8")))
+
+    def player_pages():
+        # Rendu en mémoire, dans ce seul processus : coût par cœur du pool
+        shell = {
+            "template": generate_site.read_text(generate_site.PLAYER_TEMPLATE_FILE),
+            "stylesheets": ["../../assets/site.css"],
+            "race_names": state["race_names"],
+        }
+        parts = generate_site.PLACEHOLDER.split(shell["template"])
+        return [len(generate_site.render_player_page(parts, shell, p)) for p in state["players"]]
+
+    timed(results, "player_pages", player_pages, len)
+
+def bench_parser(pages, results, repeat=20):
+    matchers = {s["code"]: RaceMatcher(s["races"]) for s in SERVERS}
+    all_races = RaceMatcher([r for s in SERVERS for r in s["races"]])
+
+    def parse():
+        parsed = 0
+        for _ in range(repeat):
+            for server, html in pages:
+                rows, _ = parse_ranking(html, matchers.get(server, all_races))
+                parsed += len(rows)
+        return parsed
+
+    timed(results, "row_parser", parse, lambda n: n)
+
+# =====================
+# RAPPORT
+# =====================
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def peak_memory_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # octets sous macOS
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark des étapes scraping/génération")
+    parser.add_argument("--years", type=int, default=1, help="années d'historique synthétique (1 à 5)")
+    parser.add_argument("--players", type=int, default=ROWS_PER_PAGE * DEFAULT_PAGES,
+                        help="joueurs classés par serveur et par jour")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--csv", help="CSV existant à mesurer au lieu d'un historique synthétique")
+    parser.add_argument("--pages", help="dossier de pages ?a=rank capturées (<serveur>_<page>.html)")
+    parser.add_argument("--repeat", type=int, default=20, help="passages du parseur sur les pages")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--keep", action="store_true", help="garder le CSV synthétique")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="bw_bench_")
+    try:
+        results = {}
+        csv_path = args.csv
+        if csv_path is None:
+            csv_path = os.path.join(workdir, "bloodwars_classement.csv")
+            rows = timed(results, "synthesize",
+                         lambda: synthetic_history(csv_path, args.years, args.players, args.seed),
+                         lambda n: n)
+            print(f"🧪 Historique synthétique : {rows} lignes, {os.path.getsize(csv_path) // 1024} Ko")
+
+        bench_generate(csv_path, results)
+        pages = captured_pages(args.pages) if args.pages else synthetic_pages(csv_path)
+        bench_parser(pages, results, args.repeat)
+
+        report = {
+            "commit": git_commit(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {
+                "csv": args.csv, "years": None if args.csv else args.years,
+                "players": None if args.csv else args.players, "seed": args.seed,
+                "engine": engine_name(),
+                "pages": args.pages or "synthetic", "page_count": len(pages), "repeat": args.repeat,
+            },
+            "csv_bytes": os.path.getsize(csv_path),
+            "peak_memory_kb": peak_memory_kb(),
+            "stages": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1, ensure_ascii=False)
+        print(f"✅ Résultats écrits dans {args.output}")
+
+        if args.keep and args.csv is None:
+            kept = os.path.join(os.getcwd(), f"synthetic_{args.years}y.csv")
+            shutil.copy(csv_path, kept)
+            print(f"💾 CSV synthétique gardé : {kept}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
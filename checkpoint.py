@@ -0,0 +1,84 @@
+import csv
+import json
+import os
+
+# =====================
+# CHECKPOINTS DE SCRAPING
+# =====================
+# Le manifeste note chaque unité (date, serveur, page) terminée :
+#   {"2026-01-15": {"R1": [1, 2, 3, 4], "R7": [1, 2]}}
+# Une relance ne refait que les pages manquantes.
+
+KEEP_DAYS = 30  # dates conservées dans le manifeste
+
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+        self.units = {}
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                self.units = json.load(f)
+
+    def done_pages(self, day, server_code):
+        return set(self.units.get(day, {}).get(server_code, []))
+
+    def pending_pages(self, day, server_code, pages):
+        done = self.done_pages(day, server_code)
+        return [p for p in pages if p not in done]
+
+    def last_page(self, day, server_code):
+        """Dernière page du classement relevée ce jour-là, ou None si pas encore connue"""
+        return self.units.get(day, {}).get("last_page", {}).get(server_code)
+
+    def set_last_page(self, day, server_code, page):
+        self.units.setdefault(day, {}).setdefault("last_page", {})[server_code] = page
+        self.save()
+
+    def mark(self, day, server_code, page):
+        pages = self.units.setdefault(day, {}).setdefault(server_code, [])
+        if page not in pages:
+            pages.append(page)
+            pages.sort()
+        self.save()
+
+    def save(self):
+        for old in sorted(self.units)[:-KEEP_DAYS]:
+            del self.units[old]
+
+        # Écriture atomique : un crash ne laisse jamais un manifeste à moitié écrit
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.units, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+# =====================
+# LIGNES DÉJÀ ÉCRITES
+# =====================
+def existing_keys(csv_path, day, block_size=64 * 1024):
+    """Renvoie les (serveur, position) déjà présents dans le CSV pour `day`
+
+    Les lignes sont ajoutées par date croissante : on lit le fichier depuis
+    la fin et on s'arrête à la première ligne d'une autre date.
+    """
+    if not os.path.isfile(csv_path):
+        return set()
+
+    prefix = f'"{day}";'.encode("utf-8")
+    with open(csv_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        lines = []
+        while pos > 0:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            buf = f.read(size) + buf
+            lines = buf.split(b"\n")
+            complete = lines if pos == 0 else lines[1:]
+            if any(line.strip() and not line.startswith(prefix) for line in complete):
+                break
+        complete = lines if pos == 0 else lines[1:]
+
+    today_lines = [line.decode("utf-8").rstrip("\r") for line in complete if line.startswith(prefix)]
+    return {(row[1], int(row[2])) for row in csv.reader(today_lines, delimiter=";")}
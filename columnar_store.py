@@ -0,0 +1,233 @@
+import csv
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections import defaultdict
+
+# =====================
+# STOCKAGE COLONNAIRE PARTITIONNÉ
+# =====================
+# Un fichier par (date, serveur) : history/2026-01-15/R1.bwc
+# Chaque partition contient 4 colonnes typées compressées (zlib) :
+#   position (int32), points (int64), nom (int32), race (uint8)
+# Les noms et les races sont des index dans history/dictionary.json,
+# partagé par toutes les partitions et complété au fil des ajouts.
+# Le dictionnaire note aussi "imported" : tout l'historique du CSV a été
+# importé, le dossier peut remplacer le CSV comme source du site.
+
+MAGIC = b"BWC1"
+HEADER = struct.Struct("<4sI")
+EXTENSION = ".bwc"
+CSV_FIELDS = ["date", "server", "position", "name", "race", "points"]
+
+def _to_bytes(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _from_bytes(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+def _write_atomic(path, data, mode="wb"):
+    tmp = path + ".tmp"
+    with open(tmp, mode) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+class HistoryStore:
+    def __init__(self, root):
+        self.root = root
+        self.dictionary_path = os.path.join(root, "dictionary.json")
+        self.names = []
+        self.races = []
+        self.servers = []  # ordre d'apparition, pour réexporter le CSV à l'identique
+        self.imported = False
+        self._load_dictionary()
+
+    # -------------------- Dictionnaire --------------------
+    def _load_dictionary(self):
+        if os.path.isfile(self.dictionary_path):
+            with open(self.dictionary_path, encoding="utf-8") as f:
+                d = json.load(f)
+            self.names = d["names"]
+            self.races = d["races"]
+            self.servers = d.get("servers", [])
+            self.imported = d.get("imported", False)
+        self._name_ids = {n: i for i, n in enumerate(self.names)}
+        self._race_ids = {r: i for i, r in enumerate(self.races)}
+
+    def _name_id(self, name):
+        i = self._name_ids.get(name)
+        if i is None:
+            i = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def _race_id(self, race):
+        i = self._race_ids.get(race)
+        if i is None:
+            i = self._race_ids[race] = len(self.races)
+            self.races.append(race)
+        return i
+
+    def _save_dictionary(self):
+        os.makedirs(self.root, exist_ok=True)
+        data = json.dumps(
+            {"names": self.names, "races": self.races, "servers": self.servers, "imported": self.imported},
+            ensure_ascii=False
+        )
+        _write_atomic(self.dictionary_path, data, "w")
+
+    def mark_imported(self):
+        self.imported = True
+        self._save_dictionary()
+
+    # -------------------- Partitions --------------------
+    def partition_path(self, day, server):
+        return os.path.join(self.root, day, server + EXTENSION)
+
+    def dates(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def servers_for(self, day):
+        folder = os.path.join(self.root, day)
+        found = {f[:-len(EXTENSION)] for f in os.listdir(folder) if f.endswith(EXTENSION)}
+        ordered = [s for s in self.servers if s in found]
+        return ordered + sorted(found - set(ordered))
+
+    def write_partition(self, day, server, rows):
+        """Écrit (ou remplace) la partition ; rows = dicts position/name/race/points"""
+        rows = sorted(rows, key=lambda r: int(r["position"]))
+        positions = array("i", (int(r["position"]) for r in rows))
+        points = array("q", (int(r["points"]) for r in rows))
+        names = array("i", (self._name_id(r["name"]) for r in rows))
+        races = array("B", (self._race_id(r["race"]) for r in rows))
+        if server not in self.servers:
+            self.servers.append(server)
+
+        # Le dictionnaire d'abord : une partition ne référence jamais un id inconnu
+        self._save_dictionary()
+
+        body = b"".join(_to_bytes(col) for col in (positions, points, names, races))
+        os.makedirs(os.path.join(self.root, day), exist_ok=True)
+        _write_atomic(
+            self.partition_path(day, server),
+            HEADER.pack(MAGIC, len(rows)) + zlib.compress(body, 6)
+        )
+
+    def merge_partition(self, day, server, rows):
+        """Ajoute des lignes à une partition existante, sans doublon de position"""
+        merged = {r["position"]: r for r in self.read_partition(day, server)}
+        for r in rows:
+            merged[int(r["position"])] = r
+        self.write_partition(day, server, merged.values())
+
+    def read_columns(self, day, server):
+        """Renvoie les colonnes brutes (positions, points, ids noms, ids races)"""
+        path = self.partition_path(day, server)
+        if not os.path.isfile(path):
+            return array("i"), array("q"), array("i"), array("B")
+
+        with open(path, "rb") as f:
+            magic, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Partition invalide : {path}")
+            body = zlib.decompress(f.read())
+
+        sizes = [("i", 4), ("q", 8), ("i", 4), ("B", 1)]
+        columns = []
+        offset = 0
+        for typecode, width in sizes:
+            end = offset + count * width
+            columns.append(_from_bytes(typecode, body[offset:end]))
+            offset = end
+        return columns
+
+    def read_partition(self, day, server):
+        positions, points, names, races = self.read_columns(day, server)
+        if (names and max(names) >= len(self.names)) or (races and max(races) >= len(self.races)):
+            # Partition écrite par un autre processus (scraping en cours) après
+            # notre lecture du dictionnaire, qui est toujours enregistré avant elle
+            self._load_dictionary()
+        return [
+            {
+                "position": positions[i],
+                "name": self.names[names[i]],
+                "race": self.races[races[i]],
+                "points": points[i],
+            }
+            for i in range(len(positions))
+        ]
+
+    def iter_rows(self, dates=None, servers=None):
+        """Parcourt les lignes des seules partitions demandées"""
+        wanted = set(dates) if dates is not None else None
+        for day in self.dates():
+            if wanted is not None and day not in wanted:
+                continue
+            for server in self.servers_for(day):
+                if servers is not None and server not in servers:
+                    continue
+                for row in self.read_partition(day, server):
+                    row["date"] = day
+                    row["server"] = server
+                    yield row
+
+# =====================
+# CONVERSIONS CSV <-> PARTITIONS
+# =====================
+def detect_delimiter(path):
+    with open(path, encoding="utf-8") as f:
+        sample = f.read(2048)
+        return ";" if sample.count(";") > sample.count(",") else ","
+
+def csv_to_store(csv_path, root):
+    """Importe tout l'historique CSV dans des partitions (remplace celles du CSV)"""
+    groups = defaultdict(list)
+    with open(csv_path, encoding="utf-8") as f:
+        for row in csv.DictReader(f, delimiter=detect_delimiter(csv_path)):
+            groups[(row["date"], row["server"])].append(row)
+
+    store = HistoryStore(root)
+    for (day, server), rows in groups.items():
+        store.write_partition(day, server, rows)
+    store.mark_imported()
+    return len(groups)
+
+def store_to_csv(root, csv_path):
+    """Réexporte les partitions au format CSV d'origine (fins de ligne \n)
+
+    Les lignes vides du CSV importé ne sont pas conservées : à cela près,
+    l'aller-retour import/export redonne le même fichier.
+    """
+    store = HistoryStore(root)
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, delimiter=";", quoting=csv.QUOTE_ALL,
+                                lineterminator="\n")
+        writer.writeheader()
+        for row in store.iter_rows():
+            writer.writerow(row)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("import", "export"):
+        print("Usage : python columnar_store.py import <csv> <dossier>")
+        print("        python columnar_store.py export <dossier> <csv>")
+        sys.exit(2)
+
+    if sys.argv[1] == "import":
+        count = csv_to_store(sys.argv[2], sys.argv[3])
+        print(f"✅ {count} partitions écrites dans {sys.argv[3]}")
+    else:
+        store_to_csv(sys.argv[2], sys.argv[3])
+        print(f"✅ CSV exporté : {sys.argv[3]}")
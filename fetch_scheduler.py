@@ -0,0 +1,135 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import instrumentation
+
+# =====================
+# LECTURE DES PAGES D'UN ROYAUME
+# =====================
+# Un PageScheduler par serveur :
+#   - seau à jetons : au plus `rate` pages/s en régime établi, `burst` d'un coup
+#   - concurrence adaptative (AIMD) : +1 requête en vol après une série de
+#     réponses rapides, divisée par deux sur erreur ou réponse lente
+#   - reprises par page avec attente exponentielle (+ un peu d'aléa)
+# Les pages sont traitées dans l'ordre même si elles arrivent dans le désordre.
+
+TARGET_LATENCY = 3.0   # secondes : au-delà, on réduit la concurrence
+BACKOFF = 1.0          # secondes, doublé à chaque nouvelle tentative
+READ_AHEAD = 2         # pages demandées d'avance, en multiple de la concurrence
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à obtenir un jeton"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            instrumentation.record("rate_limit_wait", delay)
+            time.sleep(delay)
+
+class AdaptiveLimit:
+    """Nombre de requêtes en vol : +1 après `value` succès rapides, /2 sinon"""
+
+    def __init__(self, maximum, target_latency=TARGET_LATENCY, initial=1):
+        self.maximum = max(1, maximum)
+        self.value = min(initial, self.maximum)
+        self.target_latency = target_latency
+        self._streak = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency=None, ok=True):
+        with self._lock:
+            if not ok or latency > self.target_latency:
+                self.value = max(1, self.value // 2)
+                self._streak = 0
+                return
+            self._streak += 1
+            if self._streak >= self.value and self.value < self.maximum:
+                self.value += 1
+                self._streak = 0
+
+class PageScheduler:
+    def __init__(self, code, fetch, rate, burst, max_concurrency, retries):
+        self.code = code
+        self.fetch_page = fetch
+        self.bucket = TokenBucket(rate, burst)
+        self.limit = AdaptiveLimit(max_concurrency)
+        self.retries = retries
+
+    def fetch(self, page):
+        """Résultat de fetch_page(page), avec reprises ; lève la dernière erreur si toutes échouent"""
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            started = time.perf_counter()
+            try:
+                html = self.fetch_page(page)
+            except Exception as e:
+                self.limit.record(ok=False)
+                if attempt == self.retries:
+                    raise
+                delay = BACKOFF * 2 ** attempt + random.uniform(0, BACKOFF)
+                print(f"🔁 [{self.code}] Page {page} : {e} – nouvel essai dans {delay:.1f}s")
+                instrumentation.count("page_retries")
+                time.sleep(delay)
+                continue
+            self.limit.record(time.perf_counter() - started)
+            return html
+
+    def run(self, pages, handle):
+        """Lit les pages de l'itérable `pages` (éventuellement infini)
+
+        handle(page, résultat) est appelé dans l'ordre des pages, depuis ce
+        thread ; s'il renvoie False, plus aucune page n'est demandée ni traitée.
+        """
+        pages = iter(pages)
+        order = deque()        # pages demandées, dans l'ordre
+        results = {}
+        running = {}
+        exhausted = stopped = False
+
+        with ThreadPoolExecutor(max_workers=self.limit.maximum) as pool:
+            while True:
+                # Au plus `value` requêtes en vol, et une avance bornée sur la
+                # première page pas encore traitée (fin du classement inconnue)
+                while (not (exhausted or stopped) and len(running) < self.limit.value
+                       and len(order) < READ_AHEAD * self.limit.value):
+                    page = next(pages, None)
+                    if page is None:
+                        exhausted = True
+                        break
+                    order.append(page)
+                    running[pool.submit(self.fetch, page)] = page
+                if not running:
+                    return
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page = running.pop(future)
+                    if not stopped:
+                        # Résultat ou erreur, relevé seulement au tour de la page : une
+                        # page lue d'avance qui échoue n'interrompt pas les précédentes
+                        results[page] = future
+
+                while not stopped and order and order[0] in results:
+                    page = order.popleft()
+                    if handle(page, results.pop(page).result()) is False:
+                        stopped = True
+                if stopped:
+                    # Pages demandées au-delà de la fin : réponses et erreurs ignorées
+                    order.clear()
+                    results.clear()
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+
+# =====================
+# EMPREINTES DE BUILD
+# =====================
+# generate_site.py note l'empreinte de ses entrées et la liste des fichiers
+# produits ; push_to_github.py compare cette liste à celle du dernier push.
+#   build.json  : {"inputs": "<sha1>", "input_files": {"history/...": ["<taille:mtime>", "<sha1>"]},
+#                  "files": {"index.html": "<sha1>", ...}}
+#   pushed.json : {"files": {...}} tel qu'au dernier push réussi
+
+CACHE_DIR = ".build_cache"
+BUILD_RECORD = os.path.join(CACHE_DIR, "build.json")
+PUSH_RECORD = os.path.join(CACHE_DIR, "pushed.json")
+
+def iter_files(path):
+    if os.path.isfile(path):
+        yield path
+    elif os.path.isdir(path):
+        for folder, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                yield os.path.join(folder, name)
+
+def stat_signature(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def file_sha1(path, block_size=1024 * 1024):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def relative(path, root):
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+def inputs_fingerprint(paths, root, known=None):
+    """(empreinte du contenu de tous les fichiers sous `paths`, relevé par fichier)
+
+    `known` est le relevé du build précédent : un fichier dont la taille et
+    la date n'ont pas bougé garde son sha1 sans être relu. Seuls les fichiers
+    touchés sont hachés, et un fichier réécrit à l'identique (partition,
+    dictionary.json) ne change pas l'empreinte.
+    """
+    known = known or {}
+    digest = hashlib.sha1()
+    files = {}
+    for path in paths:
+        for file in iter_files(path):
+            name = relative(file, root)
+            signature = stat_signature(file)
+            previous = known.get(name)
+            sha1 = previous[1] if previous and previous[0] == signature else file_sha1(file)
+            files[name] = [signature, sha1]
+            digest.update(f"{name}={sha1}\n".encode("utf-8"))
+    return digest.hexdigest(), files
+
+def load_record(path):
+    if not os.path.isfile(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_record(path, record):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def changed_files(current, previous):
+    """(fichiers nouveaux ou modifiés, fichiers disparus) entre deux relevés"""
+    changed = sorted(p for p, h in current.items() if previous.get(p) != h)
+    removed = sorted(p for p in previous if p not in current)
+    return changed, removed
@@ -1,14 +1,45 @@
 import csv
+import hashlib
+import io
+import json
 import os
+import pickle
+import re
+import sys
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
 from datetime import datetime, timedelta
+from html import escape
+
+import instrumentation
+from columnar_store import HistoryStore
+from fingerprint import (
+    BUILD_RECORD, file_sha1, inputs_fingerprint, iter_files, load_record, relative,
+    save_record,
+)
+from history_db import HistoryDB, is_imported
+from matrix_engine import HistoryMatrix, engine_name
+from player_series import PlayerSeries, day_ordinal
+from site_assets import (
+    fetch_vendor, format_delta, format_size, inline_css_urls, logical_name, minify_css,
+    minify_js, precompress, prune, write_atomic, write_hashed,
+)
 
 # =====================
 # BASE DIR POUR CHEMINS ABSOLUS
 # =====================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CSV_FILE = os.path.join(BASE_DIR, "bloodwars_classement.csv")
+HISTORY_DIR = os.path.join(BASE_DIR, "history")
+DB_PATH = os.path.join(BASE_DIR, "bloodwars.sqlite")
 OUTPUT_HTML = os.path.join(BASE_DIR, "index.html")
+DATA_DIR = os.path.join(BASE_DIR, "data")
+SHARDS_DIR = os.path.join(DATA_DIR, "shards")
+ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+VENDOR_DIR = os.path.join(BASE_DIR, "vendor")
 
 # =====================
 # CONFIG
@@ -24,6 +55,7 @@ SERVER_TRANSLATION = {
 
 FR_SERVERS = {"R1", "R2", "R4"}
 PL_SERVERS = {"R3", "R7", "R14"}
+FILTER_SERVERS = ["R1", "R2", "R4", "R3", "R7", "R14"]  # cases à cocher, dans cet ordre
 
 RACE_TRANSLATION = {
     "ŁAPACZ MYŚLI": "CAPTEUR D’ESPRIT",
@@ -36,544 +68,926 @@ RACE_TRANSLATION = {
 # =====================
 # DEBUG PATHS
 # =====================
-print("Working directory:", os.getcwd())
-print("Using CSV:", CSV_FILE)
-print("HTML output:", OUTPUT_HTML)
+def print_paths():
+    print("Working directory:", os.getcwd())
+    print("Using CSV:", CSV_FILE)
+    print("Using history:", HISTORY_DIR if os.path.isdir(HISTORY_DIR) else "(absent)")
+    print("Using SQLite:", DB_PATH if os.path.isfile(DB_PATH) else "(absent)")
+    print("HTML output:", OUTPUT_HTML)
+    print("Data output:", DATA_DIR)
+    print("Player pages:", PLAYERS_DIR)
 
 # =====================
-# LOAD CSV
+# LOAD HISTORY
 # =====================
 def detect_delimiter(path):
     with open(path, encoding="utf-8") as f:
         sample = f.read(2048)
         return ";" if sample.count(";") > sample.count(",") else ","
 
-delimiter = detect_delimiter(CSV_FILE)
+def source_kind():
+    """Base SQLite, sinon partitions colonnaires, sinon le CSV
+
+    La base et les partitions ne remplacent le CSV qu'une fois tout son
+    historique importé.
+    """
+    if is_imported(DB_PATH):
+        return "sqlite"
+    if os.path.isdir(HISTORY_DIR) and HistoryStore(HISTORY_DIR).imported:
+        return "store"
+    return "csv"
+
+def open_source(kind):
+    return HistoryDB(DB_PATH) if kind == "sqlite" else HistoryStore(HISTORY_DIR)
+
+def file_digest(path, start, end):
+    with open(path, "rb") as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(end - start)).hexdigest()
+
+def read_csv_rows(state, offset, path=CSV_FILE):
+    """Lignes complètes du CSV à partir de l'octet `offset` ; avance state["csv"]["offset"]"""
+    info = state["csv"]
+
+    def lines(f):
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # ligne en cours d'écriture, reprise au prochain build
+            info["offset"] += len(line)
+            yield line.decode("utf-8")
+
+    info["offset"] = offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        if offset == 0:
+            info["delimiter"] = detect_delimiter(path)
+            reader = csv.DictReader(lines(f), delimiter=info["delimiter"])
+        else:
+            reader = csv.DictReader(lines(f), fieldnames=info["fieldnames"], delimiter=info["delimiter"])
+        yield from reader
+        info["fieldnames"] = reader.fieldnames
 
-data = defaultdict(lambda: defaultdict(list))
+# =====================
+# CACHE DE BUILD
+# =====================
+# Le build garde ses séries par joueur et les shards déjà écrits : un build
+# quotidien n'ingère que les nouvelles lignes. --full force une reconstruction.
+CACHE_DIR = os.path.join(BASE_DIR, ".build_cache")
+CACHE_FILE = os.path.join(CACHE_DIR, "state.pickle")
+CACHE_VERSION = 4
+
+SIZES_FILE = os.path.join(CACHE_DIR, "sizes.json")  # gardé même avec --full
+
+# Budgets de taille (gzip, en Ko) : le build échoue s'ils sont dépassés.
+# Le total ne porte que sur le premier chargement (page, assets, manifest) ;
+# les shards mensuels, lus à la demande, n'ont que le budget par fichier.
+BUDGET_TOTAL_KB = int(os.getenv("BW_BUDGET_TOTAL_KB", "2048"))
+BUDGET_FILE_KB = int(os.getenv("BW_BUDGET_FILE_KB", "512"))
+
+def new_state(kind):
+    return {
+        "version": CACHE_VERSION,
+        "source": kind,
+        "csv": {"offset": 0, "fieldnames": None, "delimiter": ";"},
+        "dates": [],
+        "race_names": [],     # races dans l'ordre où le build les a rencontrées
+        "race_ids": {},
+        "players": [],        # PlayerSeries, dans l'ordre d'apparition
+        "player_index": {},
+        "shard_urls": {},
+        "shard_races": [],    # table des races utilisée par les shards déjà écrits
+        "player_pages": {},   # url de la page joueur -> empreinte de sa série
+    }
 
-with open(CSV_FILE, encoding="utf-8") as f:
-    reader = csv.DictReader(f, delimiter=delimiter)
-    for row in reader:
-        date = row["date"]
-        server = row["server"]
+def load_state():
+    if not os.path.isfile(CACHE_FILE):
+        return None
+    try:
+        with open(CACHE_FILE, "rb") as f:
+            state = pickle.load(f)
+    except Exception:
+        return None
+    if state.get("version") != CACHE_VERSION or state["source"] != source_kind():
+        return None
+    return state
+
+def save_state(state):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = CACHE_FILE + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, CACHE_FILE)
+
+def csv_fingerprint(offset):
+    """Empreinte du début et des derniers octets déjà lus du CSV"""
+    return {
+        "head": file_digest(CSV_FILE, 0, min(4096, offset)),
+        "tail": file_digest(CSV_FILE, max(0, offset - 4096), offset),
+    }
+
+def new_rows(state):
+    """Lignes ajoutées depuis le dernier build, ou None si le cache n'est plus valable"""
+    if state["source"] == "csv":
+        info = state["csv"]
+        if os.path.getsize(CSV_FILE) < info["offset"]:
+            return None
+        if csv_fingerprint(info["offset"]) != info["fingerprint"]:
+            return None  # le fichier a été réécrit, pas seulement complété
+        return read_csv_rows(state, info["offset"])
+
+    dates = open_source(state["source"]).dates()
+    known = state["dates"]
+    if dates[:len(known)] != known:
+        return None
+    # La dernière date connue est relue : une reprise de scraping a pu la compléter
+    return open_source(state["source"]).iter_rows(dates=dates[len(known) - 1:] if known else None)
+
+def all_rows(state):
+    if state["source"] == "csv":
+        return read_csv_rows(state, 0)
+    return open_source(state["source"]).iter_rows()
+
+# Ingestion en flux : lecture -> traduction des races -> agrégation dans les
+# séries. Aucune étape ne garde les lignes lues, la mémoire ne dépend que du
+# nombre de joueurs et de relevés, pas de la taille du fichier source.
+def translate(rows):
+    for row in rows:
         race = row["race"]
-        race = RACE_TRANSLATION.get(race, race)
-        data[date][server].append({
-            "position": int(row["position"]),
-            "name": row["name"],
-            "race": race,
-            "points": int(row["points"]),
-        })
-
-dates_sorted = sorted(data.keys())
-print(f"📄 Dates chargées : {len(dates_sorted)}")
-
-# =====================
-# PREP DATA FOR GLOBAL TABLE
-# =====================
-all_players = []
-for date in dates_sorted:
-    for server in data[date]:
-        display_server = SERVER_TRANSLATION.get(server, server)
-        for p in data[date][server]:
-            all_players.append({
-                "date": date,
-                "server": server,
-                "display_server": display_server,
-                "race": p["race"],
-                "name": p["name"],
-                "points": p["points"],
-                "position": p["position"]
-            })
+        yield (
+            row["date"],
+            row["server"],
+            row["name"],
+            RACE_TRANSLATION.get(race, race),
+            int(row["points"]),
+            int(row["position"]),
+        )
+
+def ingest(state, records):
+    """Ajoute les relevés aux séries ; renvoie les dates touchées"""
+    players = state["players"]
+    player_index = state["player_index"]
+    race_ids = state["race_ids"]
+    touched = set()
+    count = 0
+
+    for date, server, name, race, points, position in records:
+        key = (name, server)
+        i = player_index.get(key)
+        if i is None:
+            i = player_index[key] = len(players)
+            players.append(PlayerSeries(name, server))
+
+        race_id = race_ids.get(race)
+        if race_id is None:
+            race_id = race_ids[race] = len(state["race_names"])
+            state["race_names"].append(race)
+
+        players[i].set(day_ordinal(date), points, position, race_id)
+        touched.add(date)
+        count += 1
+
+    instrumentation.count("rows_ingested", count)
+    return touched
 
 # =====================
-# HTML GENERATION
+# BUILD EN COURS
 # =====================
-html = f"""
-<!DOCTYPE html>
-<html lang="fr">
-<head>
-<meta charset="UTF-8">
-<title>Classement Bloodwars</title>
-<style>
-
-:root {{
-    --bg: #111;
-    --text: #eee;
-    --panel: #222;
-    --border: #444;
-    --accent: #f5c542;
-}}
-
-body[data-theme="light"] {{
-    --bg: #f5f5f5;
-    --text: #111;
-    --panel: #ffffff;
-    --border: #ccc;
-    --accent: #b58900;
-}}
-
-body {{
-    font-family: Arial, sans-serif;
-    background: var(--bg);
-    color: var(--text);
-    padding: 20px;
-}}
-
-h1, h2, h3 {{
-    color: var(--accent);
-}}
-
-h1, h2, h3 {{
-    color: #f5c542;
-}}
-.top-filters {{
-    display:flex;
-    justify-content:space-between;
-    align-items:flex-start;
-    margin-bottom:20px;
-}}
-.filters {{
-    flex:1;
-}}
-.button-group button.active {{
-    background-color: #f5c542;
-    color: #111;
-    font-weight: bold;
-}}
-.best-prog {{
-    color: #f5c542;
-    font-weight: bold;
-}}
-.filters label {{
-    margin-right: 15px;
-    cursor: pointer;
-}}
-#raceStats {{
-    flex:0 0 200px;
-    background: var(--panel);
-    padding:10px;
-    border-radius:5px;
-    font-size:0.9em;
-}}
-table {{
-    border-collapse: collapse;
-    width: 100%;
-    margin-top: 10px;
-}}
-th, td {{
-    border: 1px solid var(--border);
-    padding: 6px;
-    text-align: left;
-}}
-th {{
-    background: var(--panel);
-}}
-th.sorting:after, th.sorting_asc:after, th.sorting_desc:after {{
-    display: none !important;
-}}
-#progressTable_wrapper {{
-    margin-bottom: 20px;
-}}
-.button-group {{
-    margin-top: 10px;
-}}
-.button-group button {{
-    margin-right: 10px;
-    padding: 4px 8px;
-    cursor: pointer;
-}}
-.filter-line {{
-    display: flex;
-    align-items: flex-end;
-    gap: 8px;
-    margin-top: 6px;
-}}
-
-.dataTables_length select {{
-    background-color: var(--panel) !important;
-    color: var(--text) !important;
-    border: 1px solid var(--border) !important;
-    padding: 2px 4px;
-}}
-.dataTables_length {{
-    display: none;
-}}
-</style>
-
-<link rel="stylesheet" href="https://cdn.datatables.net/1.13.6/css/jquery.dataTables.min.css">
-<script src="https://code.jquery.com/jquery-3.7.1.min.js"></script>
-<script src="https://cdn.datatables.net/1.13.6/js/jquery.dataTables.min.js"></script>
-
-</head>
-<body>
-
-<h1>Progressions Bloodwars</h1>
-<button id="themeToggle" style="float:right; margin-top:-40px;">
-    ☀️ Mode clair
-</button>
-
-<div class="top-filters">
-  <div class="filters">
-    <strong>Serveurs :</strong><br>
-"""
-
-for s in ["R1", "R2", "R4", "R3", "R7", "R14"]:
-    html += f"""
-<label>
-<input type="checkbox" class="server-filter" value="{s}" checked>
-{SERVER_TRANSLATION.get(s, s)}
-</label>
-"""
-
-html += "<br><br><strong>Races :</strong><br>"
-races = sorted(list({p["race"] for p in all_players}))
-for r in races:
-    html += f"""
-<label>
-<input type="checkbox" class="race-filter" value="{r}" checked>
-{r}
-</label>
-"""
-
-# -------------------- Dates --------------------
-html += """
-<br><br>
-<div class="filter-line">
-<strong>Dates </strong>
-du <select id='date_start'>
-"""
-for d in dates_sorted:
-    html += f"<option value='{d}'>{d}</option>"
-html += """
-</select>
-au <select id='date_end'>
-"""
-for d in dates_sorted:
-    selected = "selected" if d == dates_sorted[-1] else ""
-    html += f"<option value='{d}' {selected}>{d}</option>"
-html += "</select></div>"
-
-# -------------------- Presets --------------------
-html += """
-<div class="filter-line">
-<strong>Durée :</strong>
-<span class="button-group">
-    <button id="alltime">Globale</button>
-    <button id="last30">Un mois</button>
-    <button id="last7">Une semaine</button>
-    <button id="last1">Un jour</button>
-</span>
-</div>
-</div>
-
-<div id="raceStats">
-    <!-- Stats races ici -->
-</div>
-</div>
-
-<div class="button-group" id="pageSizeButtons" style="margin-bottom:10px;">
-    <strong>Nombre de joueurs :</strong><br>
-    <button data-size="10" class="active">10</button>
-    <button data-size="25">25</button>
-    <button data-size="50">50</button>
-    <button data-size="100">100</button>
-    <button data-size="200">200</button>
-</div>
-
-<table id="progressTable" class="display">
-<thead>
-<tr>
-<th>Joueur</th>
-<th>Position</th>
-<th>Serveur</th>
-<th>Race</th>
-<th>Score début</th>
-<th>Score fin</th>
-<th>Progression</th>
-</tr>
-</thead>
-<tbody>
-</tbody>
-</table>
-
-<script>
-const allData = """ + str(all_players).replace("'", '"') + """;
-const dates_sorted = """ + str(dates_sorted).replace("'", '"') + """;
-
-function updateProgression() {
-    const selectedServers = Array.from(document.querySelectorAll('.server-filter:checked')).map(cb => cb.value);
-    const selectedRaces = Array.from(document.querySelectorAll('.race-filter:checked')).map(cb => cb.value);
-    const dateStart = document.getElementById('date_start').value;
-    const dateEnd = document.getElementById('date_end').value;
-
-    // Grouper les données par joueur + serveur
-    const playerServerMap = {};
-
-    allData.forEach(p => {
-        if (!selectedServers.includes(p.server)) return;
-        if (!selectedRaces.includes(p.race)) return;
-
-        const key = p.name + '||' + p.server;
-        if (!playerServerMap[key]) {
-            playerServerMap[key] = {
-                name: p.name,
-                server: p.server,
-                display_server: p.display_server,
-                races: {},
-                positions: {},
-                startScore: 0,
-                endScore: 0
-            };
-        }
-
-        // Race et position pour les dates sélectionnées
-        if (p.date === dateStart) {
-            playerServerMap[key].races.start = p.race;
-            playerServerMap[key].startScore = p.points;
-            playerServerMap[key].positions.start = p.position;
-        }
-        if (p.date === dateEnd) {
-            playerServerMap[key].races.end = p.race;
-            playerServerMap[key].endScore = p.points;
-            playerServerMap[key].positions.end = p.position;
-        }
-    });
-
-    // Construire le tableau à afficher
-    let tableData = [];
-    for (let key in playerServerMap) {
-        const p = playerServerMap[key];
-
-        if (p.startScore === 0) continue;
-
-        // Race affichée
-        let raceDisplay = p.races.start || p.races.end || '';
-        if (p.races.start && p.races.end && p.races.start !== p.races.end) {
-            raceDisplay = p.races.start + ' → ' + p.races.end;
-        }
-
-        // Position affichée
-        let posDisplay = '';
-        if (p.positions.start && p.positions.end && p.positions.start !== p.positions.end) {
-            posDisplay = `${p.positions.start} → ${p.positions.end}`;
-        } else if (p.positions.end) {
-            posDisplay = `${p.positions.end}`;
-        } else if (p.positions.start) {
-            posDisplay = `${p.positions.start}`;
-        }
-
-        const prog = p.endScore - p.startScore;
-
-        tableData.push({
-            name: p.name,
-            server: p.server,  
-            display_server: p.display_server,
-            race: raceDisplay,
-            startScore: p.startScore,
-            endScore: p.endScore,
-            prog: prog,
-            position: posDisplay
-        });
-    }
+# open_build() charge le cache et ingère les lignes déjà présentes ; le
+# pipeline peut l'appeler pendant le scraping, puis catch_up() ingère ce
+# qui est arrivé entre-temps juste avant l'écriture du site.
+def open_build(full=False):
+    with instrumentation.span("load_cache"):
+        state = None if full else load_state()
+        rows = new_rows(state) if state else None
+    full_build = rows is None
+    if full_build:
+        if state:
+            print("♻️ Cache de build invalide : reconstruction complète")
+        state = new_state(source_kind())
+        rows = all_rows(state)
+
+    build = {"state": state, "known_dates": state["dates"], "touched": set(), "full": full_build}
+    ingest_rows(build, rows)
+    return build
+
+def ingest_rows(build, rows):
+    state = build["state"]
+    with instrumentation.span("ingest"):
+        touched = ingest(state, translate(rows))
+    if state["source"] == "csv":
+        state["csv"]["fingerprint"] = csv_fingerprint(state["csv"]["offset"])
+    state["dates"] = sorted(set(state["dates"]) | touched)
+    build["touched"] |= touched
+
+def catch_up(build):
+    """Ingère les lignes écrites depuis open_build ; renvoie le build à utiliser"""
+    rows = new_rows(build["state"])
+    if rows is None:
+        return open_build(full=True)
+    ingest_rows(build, rows)
+    return build
+
+class SiteData:
+    """Ce que l'écriture du site lit dans le build : dates, séries, races"""
+
+    def __init__(self, state, engine=None):
+        self.dates = state["dates"]
+        self.players = state["players"]
+        self.races = sorted(state["race_names"])
+        race_index = {r: i for i, r in enumerate(self.races)}
+        # id de race du build -> index dans la table triée envoyée à la page
+        self.race_rank = [race_index[r] for r in state["race_names"]]
+        # Matrices joueurs × dates si NumPy est disponible (voir matrix_engine.py)
+        self.matrix = HistoryMatrix(self) if (engine or engine_name()) == "numpy" else None
 
-    const dt = $('#progressTable').DataTable();
-    const bestProgByServer = {};
-    tableData.forEach(p => {
-        if (!bestProgByServer[p.server] || p.prog > bestProgByServer[p.server]) {
-            bestProgByServer[p.server] = p.prog;
-        }
-    });
-
-    dt.clear();
-    dt.rows.add(
-        tableData.map(p => {
-            const isBest = p.prog === bestProgByServer[p.server];
-
-            return [
-                `<span class="${isBest ? 'best-prog' : ''}">${p.name}</span>`,
-                p.position,
-                p.display_server,
-                p.race,
-                p.startScore,
-                p.endScore,
-                `<span class="${isBest ? 'best-prog' : ''}">${p.prog}</span>`
-            ];
-        })
-    );
-    dt.draw(false);
-    updateRaceStats();
-}
+# =====================
+# DÉTECTION DES CHANGEMENTS
+# =====================
+# Rien à refaire si ni les données ni les sources du site n'ont bougé depuis
+# le dernier build réussi, et que tous les fichiers produits sont encore là.
+BUILD_INPUTS = [CSV_FILE, HISTORY_DIR, DB_PATH, TEMPLATES_DIR, STATIC_DIR, VENDOR_DIR] + [
+    os.path.join(BASE_DIR, module)
+    for module in ("generate_site.py", "site_assets.py", "player_series.py",
+                   "matrix_engine.py", "columnar_store.py", "history_db.py")
+]
+BUILD_RECORD_FILE = os.path.join(BASE_DIR, BUILD_RECORD)
+
+def current_inputs():
+    """(empreinte, relevé par fichier) ; seuls les fichiers modifiés depuis le dernier build sont relus"""
+    return inputs_fingerprint(BUILD_INPUTS, BASE_DIR, load_record(BUILD_RECORD_FILE).get("input_files"))
+
+def is_up_to_date(inputs):
+    digest, _ = inputs
+    last_build = load_record(BUILD_RECORD_FILE)
+    return (
+        last_build.get("inputs") == digest
+        and all(os.path.isfile(os.path.join(BASE_DIR, p)) for p in last_build["files"])
+    )
+
+# =====================
+# PRESETS PRÉCALCULÉS
+# =====================
+PRESETS = [("last1", 1), ("last7", 7), ("last30", 30), ("alltime", None)]
+
+def preset_window(site, days):
+    """(index début, index fin) : première date >= dernière date - days"""
+    dates_sorted = site.dates
+    end = len(dates_sorted) - 1
+    if days is None:
+        return 0, end
+    last = datetime.strptime(dates_sorted[end], "%Y-%m-%d")
+    start_str = (last - timedelta(days=days)).strftime("%Y-%m-%d")
+    start = next((i for i, d in enumerate(dates_sorted) if d >= start_str), 0)
+    return start, end
+
+def window_entries(site, start, end):
+    """[joueur, points, position, race au début, puis à la fin (None si absent)]"""
+    if site.matrix is not None:
+        return site.matrix.window_entries(start, end)
+    start_day, end_day = day_ordinal(site.dates[start]), day_ordinal(site.dates[end])
+    race_rank = site.race_rank
+    entries = []
+    for i, player in enumerate(site.players):
+        s = player.get(start_day)
+        if s is None or s[0] == 0:
+            continue
+        e = player.get(end_day)
+        entries.append(
+            [i, s[0], s[1], race_rank[s[2]]]
+            + ([e[0], e[1], race_rank[e[2]]] if e else [None, None, None])
+        )
+    return entries
+
+def compute_presets(site):
+    presets = {}
+    for mode, days in PRESETS:
+        start, end = preset_window(site, days)
+        presets[mode] = {"start": start, "end": end, "entries": window_entries(site, start, end)}
+    return presets
 
-function setActiveMode(mode) {
-    ['last1','last7','last30','alltime'].forEach(id => {
-        document.getElementById(id).classList.remove('active');
-    });
+# =====================
+# SHARDS MENSUELS
+# =====================
+# Un fichier par mois (data/shards/2026-01.json), la page ne télécharge que
+# les mois des dates de début et de fin choisies.
+def month_days(site, month):
+    """{index date: [[joueur, points, position, race], ...]} pour un mois"""
+    race_rank = site.race_rank
+    days = {di: [] for di, d in enumerate(site.dates) if d[:7] == month}
+    if site.matrix is not None:
+        return site.matrix.month_days(list(days))
+    ordinals = [(di, day_ordinal(site.dates[di])) for di in days]
+    for pi, player in enumerate(site.players):
+        for di, day in ordinals:
+            v = player.get(day)
+            if v is not None:
+                days[di].append([pi, v[0], v[1], race_rank[v[2]]])
+    return days
 
-    if (mode) {
-        document.getElementById(mode).classList.add('active');
+# =====================
+# ENCODAGE COMPACT
+# =====================
+# Tables de chaînes pour les noms/serveurs/races, colonnes plates par joueur,
+# et points/positions/jours codés en écart avec la valeur précédente du joueur.
+# Les fonctions decodeManifest/decodeShard de la page font l'inverse.
+def delta_encode(values):
+    """[a, b, c] -> [a, b - a, c - b]"""
+    out = []
+    prev = 0
+    for v in values:
+        out.append(v - prev)
+        prev = v
+    return out
+
+def encode_shard(days):
+    day_list = sorted(days)
+    series = defaultdict(dict)  # joueur -> {rang du jour dans le mois: (points, position, race)}
+    for offset, di in enumerate(day_list):
+        for pi, points, position, race in days[di]:
+            series[pi][offset] = (points, position, race)
+
+    player_ids = sorted(series)
+    counts, day_col, points_col, position_col, race_runs = [], [], [], [], []
+    for pi in player_ids:
+        offsets = sorted(series[pi])
+        values = [series[pi][o] for o in offsets]
+        counts.append(len(offsets))
+        day_col += delta_encode(offsets)
+        points_col += delta_encode([v[0] for v in values])
+        position_col += delta_encode([v[1] for v in values])
+        # Les changements de race sont rares : (race, nombre de jours) successifs
+        for race, run in groupby(v[2] for v in values):
+            race_runs += [race, len(list(run))]
+
+    return {
+        "days": day_list,
+        "player": delta_encode(player_ids),
+        "count": counts,
+        "day": day_col,
+        "points": points_col,
+        "position": position_col,
+        "race": race_runs,
     }
-}
 
-function setActivePageSize(size) {
-    document.querySelectorAll('#pageSizeButtons button').forEach(btn => {
-        btn.classList.remove('active');
-        if (btn.dataset.size == size) {
-            btn.classList.add('active');
-        }
-    });
-}
+def encode_preset(preset):
+    entries = preset["entries"]
+    return {
+        "start": preset["start"],
+        "end": preset["end"],
+        "player": delta_encode([e[0] for e in entries]),
+        "points": [e[1] for e in entries],
+        "position": [e[2] for e in entries],
+        "race": [e[3] for e in entries],
+        "gain": [None if e[4] is None else e[4] - e[1] for e in entries],
+        "end_position": [None if e[5] is None else e[5] - e[2] for e in entries],
+        "end_race": [e[6] for e in entries],
+    }
 
-function applyPageSize(size) {
-    const dt = $('#progressTable').DataTable();
-    dt.page.len(size).draw();
-    setActivePageSize(size);
-}
+def encode_players(players):
+    names = sorted({p.name for p in players})
+    name_ids = {n: i for i, n in enumerate(names)}
+    servers = list(dict.fromkeys(p.server for p in players))
+    server_ids = {s: i for i, s in enumerate(servers)}
+    return {
+        "names": names,
+        "servers": servers,
+        "player_name": [name_ids[p.name] for p in players],
+        "player_server": [server_ids[p.server] for p in players],
+    }
 
-function applyPreset(days) {
-    const end = dates_sorted[dates_sorted.length - 1];
-    const endDate = new Date(end);
-    const startDate = new Date(endDate);
-    startDate.setDate(startDate.getDate() - days);
-    const startStr = startDate.toISOString().slice(0,10);
-
-    let closestStart = dates_sorted[0];
-    for (let d of dates_sorted) {
-        if (d >= startStr) {
-            closestStart = d;
-            break;
-        }
+def dump_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def manifest_payload(site, presets, shard_urls):
+    return {
+        "dates": site.dates,
+        "races": site.races,
+        "server_names": SERVER_TRANSLATION,
+        "players": encode_players(site.players),
+        "presets": {mode: encode_preset(preset) for mode, preset in presets.items()},
+        "shards": shard_urls,
     }
 
-    document.getElementById('date_start').value = closestStart;
-    document.getElementById('date_end').value = end;
-    updateProgression();
-    if (days === 1) setActiveMode('last1');
-    else if (days === 7) setActiveMode('last7');
-    else if (days === 30) setActiveMode('last30');
+# =====================
+# ÉCRITURE DES DONNÉES
+# =====================
+def write_data(site, build, presets):
+    """Écrit les shards modifiés et le manifest ; renvoie (urls des shards, url du manifest)"""
+    state = build["state"]
+    known_dates = build["known_dates"]
+    months = sorted({d[:7] for d in site.dates})
+
+    # Seuls les mois qui ont reçu des lignes sont réécrits, sauf si les index de
+    # dates ou la table des races ont bougé (date insérée dans le passé, nouvelle race)
+    reindexed = (
+        site.dates[:len(known_dates)] != known_dates
+        or site.races != state["shard_races"]
+    )
+    dirty = {
+        m for m in months
+        if reindexed
+        or m in {d[:7] for d in build["touched"]}
+        or m not in state["shard_urls"]
+        or not os.path.isfile(os.path.join(DATA_DIR, state["shard_urls"][m]))
+    }
 
-}
+    for month in sorted(dirty):
+        name = write_hashed(SHARDS_DIR, f"{month}.json", dump_json(encode_shard(month_days(site, month))))
+        # Le nom ne change que si le mois a changé : les autres restent en cache
+        state["shard_urls"][month] = f"shards/{name}"
+    state["shard_races"] = site.races
+    instrumentation.count("shards_written", len(dirty))
 
-function applyAllTime() {
-    document.getElementById('date_start').value = dates_sorted[0];
-    document.getElementById('date_end').value = dates_sorted[dates_sorted.length - 1];
-    updateProgression();
-    setActiveMode('alltime');
-}
+    shard_urls = {m: state["shard_urls"][m] for m in months}
+    prune(SHARDS_DIR, {os.path.basename(url) for url in shard_urls.values()})
 
-function updateRaceStats() {
-    const dt = $('#progressTable').DataTable();
-    const raceCounts = {};
-    let total = 0;
-    let rowsData = dt.rows({ search: 'applied', order: 'applied' }).data().toArray();
-    const topN = dt.page.len();
-    rowsData = rowsData.slice(0, topN);
-    rowsData.forEach(row => {
-        const race = row[3]; // colonne Race
-        raceCounts[race] = (raceCounts[race] || 0) + 1;
-        total++;
-    });
-
-    let html = `<strong>Total joueurs affichés :</strong> ${total}<br><br>`;
-    for (let race in raceCounts) {
-        html += `${race} : <strong>${raceCounts[race]}</strong><br>`;
-    }
-    document.getElementById('raceStats').innerHTML = html;
-}
+    manifest = dump_json(manifest_payload(site, presets, shard_urls))
+    manifest_url = "data/" + write_hashed(DATA_DIR, "manifest.json", manifest)
+    print(f"📦 Manifest {len(manifest) // 1024} Ko, {len(dirty)}/{len(months)} shards mensuels réécrits")
+    return shard_urls, manifest_url
 
-$(document).ready(function() {
-    const dt = $('#progressTable').DataTable({
-        "pageLength": 10,
-        "lengthMenu": [10,25,50,100,200],
-        "order": [[6,"desc"]]
-    });
-
-    // Rendre la barre de recherche native capable de gérer le | comme OR (regex)
-    $('#progressTable_filter input[type="search"]').off()  // retire l'écoute par défaut
-    .on('input', function() {
-        const val = this.value.trim();
-        const dt = $('#progressTable').DataTable();
-        if (val.length === 0) {
-            dt.search('', false, false, true).draw();
-        } else {
-            // search(val, regex=true, smart=false, caseInsensitive=true)
-            dt.search(val, true, false, true).draw();
-        }
-    });
-
-
-    $('#progressTable_filter').prepend('<div style="color:#aaa; font-size:0.85em; margin-bottom:2px;">Recherche multiple avec | (ex: Alice|Bob)</div>');
-
-    // Boutons nombre de joueurs
-    document.querySelectorAll('#pageSizeButtons button').forEach(btn => {
-        btn.addEventListener('click', () => {
-            applyPageSize(parseInt(btn.dataset.size));
-        });
-    });
-
-    // Filtres serveurs & races
-    document.querySelectorAll('.server-filter, .race-filter').forEach(el => {
-        el.addEventListener('change', updateProgression);
-    });
-
-    // Sélecteurs de dates
-    document.getElementById('date_start').addEventListener('change', () => {
-        setActiveMode(null);
-        updateProgression();
-    });
-
-    document.getElementById('date_end').addEventListener('change', () => {
-        setActiveMode(null);
-        updateProgression();
-    });
-
-    // Boutons presets
-    document.getElementById('last7').addEventListener('click', () => applyPreset(7));
-    document.getElementById('last30').addEventListener('click', () => applyPreset(30));
-    document.getElementById('last1').addEventListener('click', () => applyPreset(1));
-    document.getElementById('alltime').addEventListener('click', applyAllTime);
-
-    // Stats races à chaque redraw
-    $('#progressTable').on('draw.dt', function () {
-        updateRaceStats();
-    });
-
-    // État initial
-    applyPreset(7);
-    setActiveMode('last7');
-    setActivePageSize(10);
-});
-
-function applyTheme(theme) {
-    document.body.setAttribute('data-theme', theme);
-    localStorage.setItem('theme', theme);
-
-    const btn = document.getElementById('themeToggle');
-    btn.textContent = theme === 'dark'
-        ? '☀️ Mode clair'
-        : '🌙 Mode sombre';
-}
+# =====================
+# CSS / JS STATIQUES
+# =====================
+# Sources dans static/ et vendor/, publiées minifiées et nommées par leur
+# hash dans assets/ : d'un jour à l'autre seules les données changent de nom.
+# Les bibliothèques, à version fixée, sont servies depuis une copie locale
+# dans vendor/, téléchargée une seule fois depuis leur source officielle.
+# Sans copie ni réseau, la page pointe vers cette même source officielle.
+DATATABLES_URL = "https://cdn.datatables.net/1.13.6"
+VENDOR_SCRIPTS = [
+    (os.path.join(VENDOR_DIR, "jquery", "jquery-3.7.1.min.js"),
+     "https://code.jquery.com/jquery-3.7.1.min.js"),
+    (os.path.join(VENDOR_DIR, "datatables", "jquery.dataTables-1.13.6.min.js"),
+     DATATABLES_URL + "/js/jquery.dataTables.min.js"),
+]
+VENDOR_STYLES = [
+    (os.path.join(VENDOR_DIR, "datatables", "jquery.dataTables-1.13.6.min.css"),
+     DATATABLES_URL + "/css/jquery.dataTables.min.css"),
+]
+
+def read_text(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+def publish(path, minify=None):
+    text = read_text(path)
+    if minify is not None:
+        text = minify(text)
+    if path.endswith(".css"):
+        # Les images du CSS sont intégrées : aucun chemin relatif à préserver
+        text = inline_css_urls(text, os.path.dirname(path))
+    return "assets/" + write_hashed(ASSETS_DIR, os.path.basename(path), text.encode("utf-8"))
+
+def publish_vendor(path, url):
+    return publish(path) if fetch_vendor(path, url) else url
+
+def is_local(url):
+    return not url.startswith("https://")
+
+def publish_assets():
+    """Renvoie {"stylesheets": [...], "scripts": [...], "worker": url}"""
+    # Le CSS du site passe avant celui de DataTables, comme avant
+    stylesheets = [publish(os.path.join(STATIC_DIR, "site.css"), minify_css)]
+    stylesheets += [publish_vendor(path, url) for path, url in VENDOR_STYLES]
+    scripts = [publish_vendor(path, url) for path, url in VENDOR_SCRIPTS]
+    scripts.append(publish(os.path.join(STATIC_DIR, "site.js"), minify_js))
+    worker = publish(os.path.join(STATIC_DIR, "progression_worker.js"), minify_js)
+    prune(ASSETS_DIR, {os.path.basename(url) for url in stylesheets + scripts + [worker] if is_local(url)})
+    return {"stylesheets": stylesheets, "scripts": scripts, "worker": worker}
 
-document.getElementById('themeToggle').addEventListener('click', () => {
-    const current = document.body.getAttribute('data-theme') || 'dark';
-    applyTheme(current === 'dark' ? 'light' : 'dark');
-});
+# =====================
+# VUE INITIALE
+# =====================
+# Le preset affiché au chargement, filtres par défaut (tout coché), est écrit
+# dans le <tbody>. Les autres presets sont calculés par le worker à partir
+# des entrées du manifest, déjà chargé : aucun autre fichier à télécharger.
+# Même calcul que buildRows() dans progression_worker.js.
+INITIAL_VIEW = "last7"
+
+def preset_rows(site, entries):
+    races = site.races
+    table = []
+    for i, s_pts, s_pos, s_race, e_pts, e_pos, e_race in entries:
+        player = site.players[i]
+        if player.server not in FILTER_SERVERS:
+            continue
+        has_end = e_pts is not None
+
+        race = races[s_race]
+        if has_end and races[e_race] != race:
+            race = f"{race} → {races[e_race]}"
+
+        if s_pos and has_end and e_pos and s_pos != e_pos:
+            position = f"{s_pos} → {e_pos}"
+        elif has_end and e_pos:
+            position = str(e_pos)
+        elif s_pos:
+            position = str(s_pos)
+        else:
+            position = ""
+
+        final = e_pts if has_end else 0
+        table.append((player, race, s_pts, final, final - s_pts, position))
+
+    best = {}
+    for player, _, _, _, prog, _ in table:
+        if not best.get(player.server) or prog > best[player.server]:
+            best[player.server] = prog
+
+    rows = []
+    for player, race, s_pts, final, prog, position in table:
+        cls = "best-prog" if prog == best[player.server] else ""
+        rows.append([
+            f'<span class="{cls}"><a href="{player_page_url(player)}">{escape(player.name, quote=False)}</a></span>',
+            position,
+            SERVER_TRANSLATION.get(player.server, player.server),
+            race,
+            s_pts,
+            final,
+            f'<span class="{cls}">{prog}</span>',
+        ])
+    return rows
+
+def preset_dates(site, presets):
+    """mode -> [date début, date fin], pour les boutons de la page"""
+    return {mode: [site.dates[p["start"]], site.dates[p["end"]]] for mode, p in presets.items()}
+
+def initial_view(site, presets):
+    preset = presets[INITIAL_VIEW]
+    return {
+        "start": site.dates[preset["start"]],
+        "end": site.dates[preset["end"]],
+        "rows": preset_rows(site, preset["entries"]),
+    }
 
-// Appliquer le thème sauvegardé au chargement
-const savedTheme = localStorage.getItem('theme') || 'dark';
-applyTheme(savedTheme);
+# =====================
+# HTML GENERATION
+# =====================
+# Le gabarit templates/index.html est recopié tel quel ; chaque {{ section }}
+# est remplacée par un générateur écrit directement dans le fichier de sortie.
+TEMPLATE_FILE = os.path.join(TEMPLATES_DIR, "index.html")
+PLACEHOLDER = re.compile(r"\{\{ (\w+) \}\}")
+
+def server_filters():
+    for s in FILTER_SERVERS:
+        yield (
+            f'\n<label>\n<input type="checkbox" class="server-filter" value="{escape(s)}" checked>\n'
+            f"{escape(SERVER_TRANSLATION.get(s, s))}\n</label>\n"
+        )
+
+def race_filters(races):
+    for r in races:
+        yield f'\n<label>\n<input type="checkbox" class="race-filter" value="{escape(r)}" checked>\n{escape(r)}\n</label>\n'
+
+def date_options(dates, selected=None):
+    for d in dates:
+        mark = " selected" if d == selected else ""
+        yield f'<option value="{escape(d)}"{mark}>{escape(d)}</option>'
+
+def initial_rows(rows):
+    for row in rows:
+        yield "<tr>"
+        for k, cell in enumerate(row):
+            # Nom et progression sont déjà du HTML
+            text = cell if k in (0, 6) else escape(str(cell), quote=False)
+            yield f"<td>{text}</td>"
+        yield "</tr>\n"
+
+def stylesheet_tags(urls):
+    for url in urls:
+        yield f'<link rel="stylesheet" href="{escape(url)}">\n'
+
+def script_tags(urls):
+    for url in urls:
+        yield f'<script src="{escape(url)}"></script>\n'
+
+def script_json(value):
+    """JSON sûr dans un <script> : pas de </script> possible dans une chaîne"""
+    return json.dumps(value, ensure_ascii=False).replace("</", "<\\/")
+
+def page_sections(site, presets, initial, urls):
+    return {
+        "server_filters": server_filters,
+        "race_filters": lambda: race_filters(site.races),
+        "date_start_options": lambda: date_options(site.dates, initial["start"]),
+        "date_end_options": lambda: date_options(site.dates, initial["end"]),
+        "manifest_url": lambda: [script_json(urls["manifest"])],
+        "worker_url": lambda: [script_json(urls["worker"])],
+        "stylesheets": lambda: stylesheet_tags(urls["stylesheets"]),
+        "scripts": lambda: script_tags(urls["scripts"]),
+        "presets": lambda: [script_json(preset_dates(site, presets))],
+        "initial_rows": lambda: initial_rows(initial["rows"]),
+    }
 
-</script>
+def render(template_path, out, sections):
+    with open(template_path, encoding="utf-8") as f:
+        render_parts(PLACEHOLDER.split(f.read()), out, sections)
 
-</body>
-</html>
-"""
+def render_parts(parts, out, sections):
+    # parts alterne texte statique / nom de section
+    for i, part in enumerate(parts):
+        if i % 2:
+            out.writelines(sections[part]())
+        else:
+            out.write(part)
 
 # =====================
 # WRITE FILE
 # =====================
-with open(OUTPUT_HTML, "w", encoding="utf-8") as f:
-    f.write(html)
+def write_html(sections):
+    tmp_html = OUTPUT_HTML + ".tmp"
+    with open(tmp_html, "w", encoding="utf-8") as f:
+        render(TEMPLATE_FILE, f, sections)
+    os.replace(tmp_html, OUTPUT_HTML)
+    instrumentation.count("bytes_written", os.path.getsize(OUTPUT_HTML))
+
+# =====================
+# PAGES JOUEURS
+# =====================
+# Une page statique par (joueur, serveur) dans players/<serveur>/<clé>.html :
+# courbes de points et de position, puis tout l'historique. La clé est le
+# hash cyrb53 de "serveur/nom", recalculé à l'identique par
+# progression_worker.js pour les liens du tableau. Seules les pages dont la
+# série a changé sont réécrites, par lots répartis sur un pool de processus.
+PLAYERS_DIR = os.path.join(BASE_DIR, "players")
+PLAYER_TEMPLATE_FILE = os.path.join(TEMPLATES_DIR, "player.html")
+PAGE_WORKERS = max(1, int(os.getenv("BW_PAGE_WORKERS", os.cpu_count() or 1)))
+PAGES_PER_TASK = 250
+PARALLEL_MIN_PAGES = 500  # en dessous, lancer les processus coûte plus que le rendu
+CHART_WIDTH, CHART_HEIGHT = 600, 150
+
+def imul32(a, b):
+    return (a * b) & 0xFFFFFFFF
+
+def player_key(server, name):
+    """cyrb53 de "serveur/nom" sur les unités UTF-16, comme charCodeAt() en JS"""
+    h1, h2 = 0xDEADBEEF, 0x41C6CE57
+    data = f"{server}/{name}".encode("utf-16-le")
+    for k in range(0, len(data), 2):
+        ch = data[k] | data[k + 1] << 8
+        h1 = imul32(h1 ^ ch, 2654435761)
+        h2 = imul32(h2 ^ ch, 1597334677)
+    h1 = imul32(h1 ^ (h1 >> 16), 2246822507) ^ imul32(h2 ^ (h2 >> 13), 3266489909)
+    h2 = imul32(h2 ^ (h2 >> 16), 2246822507) ^ imul32(h1 ^ (h1 >> 13), 3266489909)
+    return format(((h2 & 0x1FFFFF) << 32) + h1, "x")
+
+def player_page_url(player):
+    return f"players/{player.server}/{player_key(player.server, player.name)}.html"
+
+def svg_chart(days, values, invert=False):
+    """Courbe SVG sur l'axe des jours ; invert : la plus petite valeur en haut"""
+    if len(values) < 2:
+        return
+    lo, hi = min(values), max(values)
+    x_span = (days[-1] - days[0]) or 1
+    # Valeur constante : ligne au milieu
+    y_scale = CHART_HEIGHT / (hi - lo) if hi != lo else 0
+    points = " ".join(
+        f"{(day - days[0]) / x_span * CHART_WIDTH:.1f},"
+        f"{((v - lo) if invert else (hi - v)) * y_scale if y_scale else CHART_HEIGHT / 2:.1f}"
+        for day, v in zip(days, values)
+    )
+    yield (
+        f'<svg class="player-chart" viewBox="0 0 {CHART_WIDTH} {CHART_HEIGHT}" preserveAspectRatio="none">'
+        f'<polyline points="{points}"/></svg>\n'
+        f'<p class="chart-range">de {lo} à {hi}</p>\n'
+    )
+
+def player_summary(dates, points, positions, races):
+    yield (
+        f'<p class="player-summary">Race : <strong>{escape(races[-1])}</strong> · '
+        f"Points : <strong>{points[-1]}</strong> · Position : <strong>{positions[-1]}</strong> · "
+        f"Meilleure position : <strong>{min(positions)}</strong><br>\n"
+        f"{len(dates)} relevé(s) du {dates[0]} au {dates[-1]}</p>\n"
+    )
+
+def history_rows(dates, points, positions, races):
+    # Du plus récent au plus ancien ; gain par rapport au relevé précédent
+    for k in range(len(dates) - 1, -1, -1):
+        gain = points[k] - points[k - 1] if k else ""
+        yield (
+            f"<tr><td>{dates[k]}</td><td>{positions[k]}</td><td>{points[k]}</td>"
+            f"<td>{gain}</td><td>{escape(races[k], quote=False)}</td></tr>\n"
+        )
+
+def player_sections(shell, player):
+    days = player.days.tolist()
+    dates = [datetime.fromordinal(d).strftime("%Y-%m-%d") for d in days]
+    points, positions = player.points.tolist(), player.positions.tolist()
+    races = [shell["race_names"][r] for r in player.races]
+    title = f"{player.name} ({SERVER_TRANSLATION.get(player.server, player.server)})"
+    return {
+        "title": lambda: [escape(title, quote=False)],
+        "stylesheets": lambda: stylesheet_tags(shell["stylesheets"]),
+        "summary": lambda: player_summary(dates, points, positions, races),
+        "points_chart": lambda: svg_chart(days, points),
+        "position_chart": lambda: svg_chart(days, positions, invert=True),
+        "history_rows": lambda: history_rows(dates, points, positions, races),
+    }
+
+def render_player_page(parts, shell, player):
+    out = io.StringIO()
+    render_parts(parts, out, player_sections(shell, player))
+    return out.getvalue().encode("utf-8")
+
+def render_page_batch(shell, batch):
+    """Écrit un lot de pages [(url, série)] ; renvoie les octets écrits
+
+    Exécuté dans un processus du pool : ne dépend que de ses arguments.
+    """
+    parts = PLACEHOLDER.split(shell["template"])
+    written = 0
+    for url, player in batch:
+        payload = render_player_page(parts, shell, player)
+        path = os.path.join(BASE_DIR, url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, payload)
+        written += len(payload)
+    return written
+
+def page_digest(shell_digest, player):
+    digest = hashlib.sha1(shell_digest.encode("ascii"))
+    for column in (player.days, player.points, player.positions, player.races):
+        digest.update(column.tobytes())
+    return digest.hexdigest()
+
+def prune_player_pages(pages):
+    keep = {os.path.normpath(os.path.join(BASE_DIR, url)) for url in pages}
+    removed = 0
+    for path in iter_files(PLAYERS_DIR):
+        if path.endswith(".html") and os.path.normpath(path) not in keep:
+            os.remove(path)
+            removed += 1
+    return removed
+
+def write_player_pages(state, stylesheets):
+    """Écrit les pages joueur modifiées ; renvoie {url: empreinte} de toutes les pages"""
+    shell = {
+        "template": read_text(PLAYER_TEMPLATE_FILE),
+        # Les pages sont deux dossiers sous la racine du site
+        "stylesheets": ["../../" + url for url in stylesheets],
+        "race_names": state["race_names"],
+    }
+    # Gabarit, CSS ou code du rendu modifiés : toutes les pages sont refaites
+    shell_digest = hashlib.sha1(
+        (shell["template"] + "\n".join(shell["stylesheets"]) + file_sha1(os.path.abspath(__file__))).encode("utf-8")
+    ).hexdigest()
+
+    previous = state["player_pages"]
+    pages, dirty = {}, []
+    for player in state["players"]:
+        url = player_page_url(player)
+        pages[url] = page_digest(shell_digest, player)
+        if previous.get(url) != pages[url] or not os.path.isfile(os.path.join(BASE_DIR, url)):
+            dirty.append((url, player))
+
+    batches = [dirty[i:i + PAGES_PER_TASK] for i in range(0, len(dirty), PAGES_PER_TASK)]
+    if len(dirty) >= PARALLEL_MIN_PAGES and PAGE_WORKERS > 1:
+        with ProcessPoolExecutor(max_workers=PAGE_WORKERS) as pool:
+            written = sum(pool.map(render_page_batch, [shell] * len(batches), batches))
+        # write_atomic ne compte que dans le processus principal
+        instrumentation.count("bytes_written", written)
+    else:
+        written = sum(render_page_batch(shell, batch) for batch in batches)
+
+    state["player_pages"] = pages
+    removed = prune_player_pages(pages)
+    instrumentation.count("player_pages_written", len(dirty))
+    print(f"👤 Pages joueurs : {len(dirty)}/{len(pages)} réécrites ({written // 1024} Ko), {removed} supprimée(s)")
+    return pages
+
+# =====================
+# COMPRESSION ET BUDGET
+# =====================
+def report_sizes(first_load, shards):
+    """Compresse les fichiers, affiche le rapport ; renvoie les dépassements de budget
+
+    first_load : fichiers du premier chargement, soumis au budget total
+    shards : fichiers lus à la demande, soumis au seul budget par fichier
+    """
+    previous_sizes = {}
+    if os.path.isfile(SIZES_FILE):
+        with open(SIZES_FILE, encoding="utf-8") as f:
+            previous_sizes = json.load(f)
+
+    print(f"\n{'Fichier':<40} {'Brut':>10} {'gzip':>10} {'brotli':>10} {'Δ gzip':>10}")
+    report = {}
+    totals = []
+    for label, urls in (("Premier chargement", first_load), ("Shards (à la demande)", shards)):
+        names = []
+        for url in urls:
+            sizes = precompress(os.path.join(BASE_DIR, url))
+            name = logical_name(url)
+            names.append(name)
+            report[name] = sizes["gzip"]
+            print(
+                f"{name:<40} {format_size(sizes['raw']):>10} {format_size(sizes['gzip']):>10} "
+                f"{format_size(sizes['brotli']):>10} {format_delta(sizes['gzip'], previous_sizes.get(name)):>10}"
+            )
+        total = sum(report[n] for n in names)
+        previous = sum(previous_sizes.get(n, 0) for n in names) or None
+        print(f"{label:<40} {'':>10} {format_size(total):>10} {'':>10} {format_delta(total, previous):>10}\n")
+        totals.append(total)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(SIZES_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+
+    over_budget = [
+        f"{name} : {format_size(size)} > {BUDGET_FILE_KB} Ko"
+        for name, size in report.items() if size > BUDGET_FILE_KB * 1024
+    ]
+    if totals[0] > BUDGET_TOTAL_KB * 1024:
+        over_budget.append(f"premier chargement : {format_size(totals[0])} > {BUDGET_TOTAL_KB} Ko")
+    return over_budget
+
+def record_build(inputs, artifacts, player_pages):
+    """Fichiers à publier, pour que push_to_github.py n'envoie que ceux qui ont changé"""
+    published = artifacts + [
+        url + ext for url in artifacts for ext in (".gz", ".br")
+        if os.path.isfile(os.path.join(BASE_DIR, url + ext))
+    ]
+    files = {url: file_sha1(os.path.join(BASE_DIR, url)) for url in published}
+    # Pages joueur : l'empreinte de leur série suffit, pas besoin de les relire
+    files.update(player_pages)
+    digest, input_files = inputs
+    # Seul le CSV est publié : history/ et la base SQLite se reconstruisent à
+    # partir de lui et restent locaux (.gitignore)
+    if os.path.isfile(CSV_FILE):
+        name = relative(CSV_FILE, BASE_DIR)
+        files[name] = input_files[name][1] if name in input_files else file_sha1(CSV_FILE)
+    save_record(BUILD_RECORD_FILE, {"inputs": digest, "input_files": input_files, "files": files})
 
-print("✅ index.html généré avec succès")
\ No newline at end of file
+# =====================
+# MAIN
+# =====================
+EXIT_OK = 0
+EXIT_OVER_BUDGET = 1
+
+def write_site(build, inputs):
+    """Écrit tout le site à partir d'un build ingéré ; renvoie un code de sortie"""
+    state = build["state"]
+    with instrumentation.span("site_data"):
+        site = SiteData(state)
+    print(f"📄 Dates chargées : {len(site.dates)} (moteur {'numpy' if site.matrix is not None else 'python'})")
+    if not build["full"]:
+        print(f"⚡ Build incrémental : {len(build['touched'])} date(s) ingérée(s)")
+
+    with instrumentation.span("presets"):
+        presets = compute_presets(site)
+    with instrumentation.span("write_data"):
+        shard_urls, manifest_url = write_data(site, build, presets)
+    with instrumentation.span("publish_assets"):
+        urls = publish_assets()
+    with instrumentation.span("initial_view"):
+        initial = initial_view(site, presets)
+    prune(DATA_DIR, {os.path.basename(manifest_url)})
+    urls.update(manifest=manifest_url)
+
+    with instrumentation.span("write_html"):
+        write_html(page_sections(site, presets, initial, urls))
+    with instrumentation.span("player_pages"):
+        # Seulement le CSS du site : les pages joueur n'ont pas de DataTable
+        player_pages = write_player_pages(state, urls["stylesheets"][:1])
+
+    first_load = (
+        ["index.html"]
+        + [url for url in urls["stylesheets"] + urls["scripts"] if is_local(url)] + [urls["worker"]]
+        + [manifest_url]
+    )
+    shards = ["data/" + url for url in shard_urls.values()]
+    artifacts = first_load + shards
+    with instrumentation.span("compress"):
+        over_budget = report_sizes(first_load, shards)
+    with instrumentation.span("save_cache"):
+        save_state(state)
+
+    if over_budget:
+        print("❌ Budget de taille dépassé :")
+        for line in over_budget:
+            print("   -", line)
+        return EXIT_OVER_BUDGET
+
+    record_build(inputs, artifacts, player_pages)
+    print("✅ index.html généré avec succès")
+    return EXIT_OK
+
+def build_site(full):
+    print_paths()
+
+    inputs = current_inputs()
+    if not full and is_up_to_date(inputs):
+        print("ℹ️ Données et sources inchangées depuis le dernier build : rien à générer")
+        return EXIT_OK
+
+    return write_site(open_build(full), inputs)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    with instrumentation.run("generate_site") as stage:
+        return stage.exit(build_site("--full" in argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
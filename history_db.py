@@ -0,0 +1,213 @@
+import csv
+import os
+import sqlite3
+import sys
+
+# =====================
+# HISTORIQUE SQLITE
+# =====================
+# Base optionnelle à côté du CSV. Les index (server, date) et
+# (server, player, date) rendent les requêtes par joueur ou par période
+# indépendantes de la longueur totale de l'historique.
+# meta.imported : tout l'historique du CSV a été importé, la base peut
+# remplacer le CSV comme source du site.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS servers (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS races (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    server_id INTEGER NOT NULL REFERENCES servers(id),
+    name TEXT NOT NULL,
+    UNIQUE (server_id, name)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    date TEXT NOT NULL,
+    server_id INTEGER NOT NULL REFERENCES servers(id),
+    position INTEGER NOT NULL,
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    race_id INTEGER NOT NULL REFERENCES races(id),
+    points INTEGER NOT NULL,
+    PRIMARY KEY (date, server_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_snapshots_server_date
+    ON snapshots (server_id, date);
+CREATE INDEX IF NOT EXISTS idx_snapshots_server_player_date
+    ON snapshots (server_id, player_id, date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+ROWS_QUERY = """
+SELECT s.date, sv.code, s.position, p.name, r.name, s.points
+FROM snapshots s
+JOIN servers sv ON sv.id = s.server_id
+JOIN players p ON p.id = s.player_id
+JOIN races r ON r.id = s.race_id
+"""
+
+class HistoryDB:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self._ids = {"servers": {}, "races": {}, "players": {}}
+
+    def close(self):
+        self.conn.close()
+
+    # -------------------- Écriture --------------------
+    def _lookup(self, table, key, select, insert):
+        cache = self._ids[table]
+        i = cache.get(key)
+        if i is None:
+            found = self.conn.execute(select, key).fetchone()
+            i = found[0] if found else self.conn.execute(insert, key).lastrowid
+            cache[key] = i
+        return i
+
+    def server_id(self, code):
+        return self._lookup("servers", (code,),
+                            "SELECT id FROM servers WHERE code = ?",
+                            "INSERT INTO servers (code) VALUES (?)")
+
+    def race_id(self, race):
+        return self._lookup("races", (race,),
+                            "SELECT id FROM races WHERE name = ?",
+                            "INSERT INTO races (name) VALUES (?)")
+
+    def player_id(self, server_id, name):
+        return self._lookup("players", (server_id, name),
+                            "SELECT id FROM players WHERE server_id = ? AND name = ?",
+                            "INSERT INTO players (server_id, name) VALUES (?, ?)")
+
+    def write_rows(self, rows):
+        """Écrit toutes les lignes en une seule transaction (rejouable sans doublon)"""
+        with self.conn:
+            for r in rows:
+                server_id = self.server_id(r["server"])
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        r["date"],
+                        server_id,
+                        int(r["position"]),
+                        self.player_id(server_id, r["name"]),
+                        self.race_id(r["race"]),
+                        int(r["points"]),
+                    )
+                )
+
+    def imported(self):
+        return self.conn.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone() is not None
+
+    def mark_imported(self):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('imported', '1')")
+
+    # -------------------- Lecture --------------------
+    def dates(self):
+        return [d for (d,) in self.conn.execute("SELECT DISTINCT date FROM snapshots ORDER BY date")]
+
+    def iter_rows(self, dates=None, servers=None):
+        """Lignes au format du CSV, triées par date, serveur puis position"""
+        clauses, params = [], []
+        if dates is not None:
+            dates = list(dates)
+            clauses.append(f"s.date IN ({','.join('?' * len(dates))})")
+            params += dates
+        if servers is not None:
+            servers = list(servers)
+            clauses.append(f"sv.code IN ({','.join('?' * len(servers))})")
+            params += servers
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        cursor = self.conn.execute(
+            f"{ROWS_QUERY} {where} ORDER BY s.date, s.server_id, s.position", params
+        )
+        for date, server, position, name, race, points in cursor:
+            yield {
+                "date": date,
+                "server": server,
+                "position": position,
+                "name": name,
+                "race": race,
+                "points": points,
+            }
+
+    def player_history(self, server, name):
+        """[(date, position, race, points)] d'un joueur, via l'index joueur/date"""
+        return self.conn.execute(
+            """
+            SELECT s.date, s.position, r.name, s.points
+            FROM snapshots s
+            JOIN servers sv ON sv.id = s.server_id
+            JOIN players p ON p.id = s.player_id AND p.server_id = s.server_id
+            JOIN races r ON r.id = s.race_id
+            WHERE sv.code = ? AND p.name = ?
+            ORDER BY s.date
+            """,
+            (server, name)
+        ).fetchall()
+
+    def top_gainers(self, date_start, date_end, limit=10):
+        """[(server, name, points début, points fin, progression)] entre deux dates"""
+        return self.conn.execute(
+            """
+            SELECT sv.code, p.name, a.points, b.points, b.points - a.points AS prog
+            FROM snapshots a
+            JOIN snapshots b
+              ON b.server_id = a.server_id AND b.player_id = a.player_id AND b.date = ?
+            JOIN servers sv ON sv.id = a.server_id
+            JOIN players p ON p.id = a.player_id
+            WHERE a.date = ?
+            ORDER BY prog DESC
+            LIMIT ?
+            """,
+            (date_end, date_start, limit)
+        ).fetchall()
+
+# =====================
+# IMPORT CSV
+# =====================
+def is_imported(path):
+    """True si la base existe et contient tout l'historique du CSV"""
+    if not os.path.isfile(path):
+        return False
+    conn = sqlite3.connect(path)
+    try:
+        found = conn.execute("SELECT value FROM meta WHERE key = 'imported'").fetchone()
+    except sqlite3.OperationalError:
+        found = None  # base créée avant la table meta
+    finally:
+        conn.close()
+    return found is not None
+
+def import_csv(csv_path, db_path):
+    with open(csv_path, encoding="utf-8") as f:
+        sample = f.read(2048)
+        f.seek(0)
+        delimiter = ";" if sample.count(";") > sample.count(",") else ","
+        db = HistoryDB(db_path)
+        db.write_rows(csv.DictReader(f, delimiter=delimiter))
+    db.mark_imported()
+    count = db.conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+    db.close()
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage : python history_db.py <csv> <base.sqlite>")
+        sys.exit(2)
+
+    count = import_csv(sys.argv[1], sys.argv[2])
+    print(f"✅ {count} lignes dans {os.path.basename(sys.argv[2])}")
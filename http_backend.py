@@ -0,0 +1,172 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# =====================
+# CONFIG
+# =====================
+HTTP_TIMEOUT = 15  # secondes par requête
+POOL_SIZE = 4
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0"
+
+CLICK_HERE_TEXT = "Cliquez ici"
+
+META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+
+# =====================
+# PARSING HTML
+# =====================
+class PageParser(HTMLParser):
+    """Relève les formulaires et les liens d'une page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.forms = []
+        self.links = []
+        self._form = None
+        self._select = None
+        self._link = None
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag == "form":
+            self._form = {
+                "action": attrs.get("action") or "",
+                "method": (attrs.get("method") or "get").lower(),
+                "fields": {},
+                "selects": {},
+            }
+            self.forms.append(self._form)
+        elif tag == "input" and self._form is not None and attrs.get("name"):
+            kind = (attrs.get("type") or "text").lower()
+            if kind in ("checkbox", "radio") and "checked" not in attrs:
+                return
+            self._form["fields"][attrs["name"]] = attrs.get("value") or ""
+        elif tag == "select" and self._form is not None:
+            self._select = attrs.get("name") or attrs.get("id")
+            if attrs.get("id"):
+                self._form["selects"][attrs["id"]] = self._select
+        elif tag == "a":
+            self._link = {"href": attrs.get("href") or "", "text": ""}
+            self.links.append(self._link)
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(0, self._skip - 1)
+        elif tag == "form":
+            self._form = None
+        elif tag == "select":
+            self._select = None
+        elif tag == "a":
+            self._link = None
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._link is not None:
+            self._link["text"] += data
+
+def page_text(response):
+    """HTML décodé avec le charset de l'en-tête, sinon celui du <meta>, sinon deviné
+
+    Sans charset dans l'en-tête, requests suppose ISO-8859-1 : les races
+    polonaises (ŁAPACZ MYŚLI...) seraient illisibles et toutes les lignes rejetées.
+    """
+    if "charset=" in response.headers.get("Content-Type", "").lower():
+        return response.text
+    found = META_CHARSET.search(response.content[:4096])
+    encoding = found.group(1).decode("ascii") if found else response.apparent_encoding
+    try:
+        return response.content.decode(encoding or "utf-8", errors="replace")
+    except LookupError:  # charset inconnu de Python
+        return response.content.decode("utf-8", errors="replace")
+
+def parse_page(html):
+    parser = PageParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+# =====================
+# BACKEND
+# =====================
+def new_session():
+    """Session HTTP avec pool de connexions keep-alive et cookies persistants"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+class HttpBackend:
+    """Connexion et lecture du classement en HTTP direct, sans navigateur"""
+
+    name = "http"
+    max_concurrency = POOL_SIZE  # une connexion keep-alive par requête en vol
+
+    def __init__(self, server, session=None):
+        self.server = server
+        self.session = session or new_session()
+
+    def get(self, url):
+        response = self.session.get(url, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        return response
+
+    def login(self, login, password):
+        SERVER_CODE = self.server["code"]
+        SERVER_URL = self.server["server_url"]
+
+        print(f"\n🌍 Ouverture portail {SERVER_CODE} (http)")
+        response = self.get(self.server["portal"])
+
+        form = next((f for f in parse_page(page_text(response)).forms if "login" in f["fields"]), None)
+        if form is None:
+            print(f"❌ Formulaire de connexion introuvable ({SERVER_CODE})")
+            return False
+
+        fields = dict(form["fields"])
+        fields[form["selects"].get("i_realm", "i_realm")] = self.server["realm"]
+        fields["login"] = login
+        fields["password"] = password
+
+        action = urljoin(response.url, form["action"])
+        if form["method"] == "post":
+            response = self.session.post(action, data=fields, timeout=HTTP_TIMEOUT)
+        else:
+            response = self.session.get(action, params=fields, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+
+        # Le portail peut renvoyer une page intermédiaire avec un lien "Cliquez ici"
+        if not response.url.startswith(SERVER_URL):
+            page = parse_page(page_text(response))
+            link = next((l for l in page.links if CLICK_HERE_TEXT in l["text"]), None)
+            if link and link["href"]:
+                response = self.get(urljoin(response.url, link["href"]))
+
+        print(f"📍 [{SERVER_CODE}] URL actuelle : {response.url}")
+
+        if not response.url.startswith(SERVER_URL):
+            print(f"❌ Échec connexion {SERVER_CODE}")
+            return False
+
+        if any("login" in f["fields"] or "password" in f["fields"] for f in parse_page(page_text(response)).forms):
+            print(f"❌ Toujours sur un formulaire ({SERVER_CODE})")
+            return False
+
+        print(f"✅ Connecté au serveur {SERVER_CODE}")
+        return True
+
+    def fetch_rank_page(self, page):
+        """Renvoie le HTML de la page de classement"""
+        return page_text(self.get(f"{self.server['server_url']}/?a=rank&page={page}"))
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,202 @@
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows : psutil si installé, sinon pas de pic mémoire
+    resource = None
+
+# =====================
+# MESURES D'EXÉCUTION
+# =====================
+# Chaque script ouvre une mesure avec `with run("generate_site") as stage:`.
+# Pendant l'exécution, span("login.R1") chronomètre un bloc et
+# count("rows_parsed", n) incrémente un compteur. À la sortie, un rapport
+# JSON est écrit dans run_reports/ :
+#   {"name", "started", "seconds", "exit_codes", "peak_memory_kb",
+#    "spans": {"login.R1": {"seconds", "calls"}}, "counters": {...}}
+# Les spans des threads (un par royaume) s'additionnent : leur total peut
+# dépasser la durée du script.
+#
+# Analyse fine, à la demande :
+#   BW_PROFILE=1      cProfile du thread principal -> run_reports/<rapport>.prof
+#   BW_TRACEMALLOC=1  pic mémoire Python et principales allocations
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORTS_DIR = os.path.join(BASE_DIR, "run_reports")
+KEEP_REPORTS = 30   # rapports conservés par script
+TOP_ENTRIES = 20    # fonctions / allocations listées dans le rapport
+
+class Run:
+    def __init__(self, name):
+        self.name = name
+        self.started = datetime.now()
+        self.started_perf = time.perf_counter()
+        self.spans = {}           # nom -> [secondes, appels]
+        self.counters = Counter()
+        self.exit_codes = {}
+        self.extra = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name, seconds):
+        with self._lock:
+            total = self.spans.setdefault(name, [0.0, 0])
+            total[0] += seconds
+            total[1] += 1
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def report(self):
+        return {
+            "name": self.name,
+            "started": self.started.isoformat(timespec="seconds"),
+            "seconds": round(time.perf_counter() - self.started_perf, 3),
+            "exit_codes": self.exit_codes,
+            "peak_memory_kb": peak_memory_kb(),
+            "spans": {
+                name: {"seconds": round(seconds, 4), "calls": calls}
+                for name, (seconds, calls) in sorted(self.spans.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            **self.extra,
+        }
+
+class Stage:
+    """Ce que `with run(...)` renvoie : un script y note son code de sortie"""
+
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def exit(self, code):
+        self.run.exit_codes[self.name] = code
+        return code
+
+_current = None
+
+@contextmanager
+def span(name):
+    run = _current
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if run is not None:
+            run.add_span(name, time.perf_counter() - started)
+
+def record(name, seconds):
+    """Span déjà chronométré par l'appelant"""
+    if _current is not None:
+        _current.add_span(name, seconds)
+
+def count(name, n=1):
+    if _current is not None:
+        _current.count(name, n)
+
+@contextmanager
+def run(name):
+    """Mesure un script ; dans un script déjà mesuré (pipeline.py), simple span"""
+    global _current
+    if _current is not None:
+        with span(name):
+            yield Stage(_current, name)
+        return
+
+    measured = _current = Run(name)
+    profiler = start_profiling()
+    try:
+        with span(name):
+            yield Stage(measured, name)
+    except BaseException as e:
+        measured.extra["error"] = repr(e)
+        raise
+    finally:
+        _current = None
+        write_report(measured, profiler)
+
+# =====================
+# MÉMOIRE ET PROFILAGE
+# =====================
+def peak_memory_kb():
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak  # octets sous macOS
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss) // 1024
+
+def start_profiling():
+    if os.getenv("BW_TRACEMALLOC") == "1":
+        tracemalloc.start()
+    if os.getenv("BW_PROFILE") == "1":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    return None
+
+def profile_summary(profiler, path):
+    profiler.disable()
+    profiler.dump_stats(path)
+    stats = pstats.Stats(profiler)
+    top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_ENTRIES]
+    return {
+        "file": os.path.basename(path),
+        "top_cumulative": [
+            {"function": f"{os.path.basename(file)}:{line}({func})", "calls": calls, "cumulative": round(cumulative, 4)}
+            for (file, line, func), (_, calls, _, cumulative, _) in top
+        ],
+    }
+
+def tracemalloc_summary():
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "peak_kb": peak // 1024,
+        "top_allocations": [
+            {"where": str(stat.traceback), "size_kb": stat.size // 1024, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:TOP_ENTRIES]
+        ],
+    }
+
+# =====================
+# RAPPORT
+# =====================
+def write_report(measured, profiler=None):
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    stem = os.path.join(REPORTS_DIR, f"{measured.name}_{measured.started:%Y%m%d-%H%M%S}")
+    if profiler is not None:
+        measured.extra["profile"] = profile_summary(profiler, stem + ".prof")
+    if tracemalloc.is_tracing():
+        measured.extra["tracemalloc"] = tracemalloc_summary()
+
+    tmp = stem + ".json.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(measured.report(), f, indent=1, ensure_ascii=False)
+    os.replace(tmp, stem + ".json")
+    prune_reports(measured.name)
+    print(f"📈 Rapport d'exécution : {os.path.relpath(stem + '.json', BASE_DIR)}")
+
+def prune_reports(name):
+    reports = sorted(
+        f for f in os.listdir(REPORTS_DIR)
+        if f.startswith(name + "_") and f.endswith(".json")
+    )
+    for old in reports[:-KEEP_REPORTS]:
+        for path in (old, old[:-len(".json")] + ".prof"):
+            if os.path.isfile(os.path.join(REPORTS_DIR, path)):
+                os.remove(os.path.join(REPORTS_DIR, path))
@@ -0,0 +1,143 @@
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import generate_site
+import instrumentation
+import push_to_github
+
+# =====================
+# PIPELINE QUOTIDIEN
+# =====================
+# scraping -> génération -> push dans un seul processus, sans console ni
+# pause : lancé tel quel par run_all.bat sous Windows ou par cron sous Linux.
+#   python pipeline.py [--full] [--skip-scrape] [--no-push]
+#
+# Dès qu'un premier serveur est scrapé, le chargement de l'historique pour
+# la génération démarre en parallèle des serveurs encore en cours.
+
+# Un seul rapport d'exécution (run_reports/pipeline_*.json) pour les trois
+# étapes : chaque script y ajoute ses spans et compteurs.
+
+# Codes de sortie : dizaine = étape en échec, unité = code renvoyé par l'étape
+# (9 si elle a levé une exception). 21 = génération, budget de taille dépassé.
+# 12 = scraping partiel : des serveurs ont échoué, mais les autres ont été
+# générés et poussés (le code n'est renvoyé qu'à la fin, si rien d'autre n'échoue).
+EXIT_OK = 0
+EXIT_SCRAPE = 10
+EXIT_GENERATE = 20
+EXIT_PUSH = 30
+
+def run_stage(name, func, timings):
+    """Exécute une étape, note sa durée ; renvoie son code (9 si exception)"""
+    print(f"\n🚀 {name}")
+    started = time.perf_counter()
+    try:
+        code = func()
+    except Exception:
+        traceback.print_exc()
+        code = 9
+    timings.append((name, time.perf_counter() - started, code))
+    return code
+
+def print_timings(timings):
+    print(f"\n{'Étape':<28} {'Durée':>8}  Code")
+    for name, seconds, code in timings:
+        print(f"{name:<28} {seconds:>7.1f}s  {code}")
+
+# =====================
+# ÉTAPES
+# =====================
+def scrape(full, timings, prep_pool):
+    """Scraping ; renvoie (code, partiel ?, future du build préparé pendant le scraping ou None)"""
+    # Import ici : --skip-scrape fonctionne sans les dépendances du scraping
+    import scrap_classement
+
+    prepared = []
+
+    def prepare():
+        started = time.perf_counter()
+        with instrumentation.span("prepare_build"):
+            build = generate_site.open_build(full)
+        timings.append(("préparation (en parallèle)", time.perf_counter() - started, 0))
+        return build
+
+    def on_server_done(code):
+        if not prepared:
+            print(f"🧩 {code} terminé : chargement de l'historique en parallèle")
+            prepared.append(prep_pool.submit(prepare))
+
+    code = run_stage("Scraping", lambda: scrap_classement.main(on_server_done), timings)
+    return code, code == scrap_classement.EXIT_PARTIAL, (prepared[0] if prepared else None)
+
+def generate(full, prepared, timings):
+    def build_site():
+        generate_site.print_paths()
+        inputs = generate_site.current_inputs()
+        if not full and generate_site.is_up_to_date(inputs):
+            print("ℹ️ Données et sources inchangées depuis le dernier build : rien à générer")
+            return generate_site.EXIT_OK
+        if prepared is not None:
+            # Les lignes des serveurs terminés après le démarrage sont ajoutées ici
+            build = generate_site.catch_up(prepared.result())
+        else:
+            build = generate_site.open_build(full)
+        return generate_site.write_site(build, inputs)
+
+    def stage():
+        with instrumentation.run("generate_site") as measured:
+            return measured.exit(build_site())
+
+    return run_stage("Génération du site", stage, timings)
+
+# =====================
+# MAIN
+# =====================
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    with instrumentation.run("pipeline") as stage:
+        return stage.exit(run_pipeline(argv))
+
+def run_pipeline(argv):
+    full = "--full" in argv
+    started = time.perf_counter()
+    timings = []
+    scrape_code = 0
+
+    with ThreadPoolExecutor(max_workers=1) as prep_pool:
+        prepared = None
+        if "--skip-scrape" not in argv:
+            code, partial, prepared = scrape(full, timings, prep_pool)
+            if partial:
+                # Les serveurs réussis sont publiés quand même ; l'échec est rendu à la fin
+                print("⚠️ Scraping partiel : génération et push des serveurs réussis")
+                scrape_code = code
+            elif code:
+                print("❌ Erreur lors du scraping, arrêt du pipeline")
+                print_timings(timings)
+                return EXIT_SCRAPE + code
+
+        code = generate(full, prepared, timings)
+        if code:
+            print("❌ Erreur lors de la génération du site, arrêt du pipeline")
+            print_timings(timings)
+            return EXIT_GENERATE + code
+
+    if "--no-push" not in argv:
+        code = run_stage("Push vers GitHub", push_to_github.main, timings)
+        if code:
+            print("❌ Erreur lors du push, vérifiez git")
+            print_timings(timings)
+            return EXIT_PUSH + code
+
+    print_timings(timings)
+    if scrape_code:
+        print(f"\n⚠️ Pipeline terminé en {time.perf_counter() - started:.1f}s, scraping incomplet")
+        return EXIT_SCRAPE + scrape_code
+    print(f"\n✅ Pipeline terminé en {time.perf_counter() - started:.1f}s")
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
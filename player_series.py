@@ -0,0 +1,51 @@
+from array import array
+from bisect import bisect_left
+from datetime import date
+from functools import lru_cache
+
+# =====================
+# SÉRIE D'UN JOUEUR
+# =====================
+# Une instance par (joueur, serveur). Les valeurs sont rangées dans des
+# colonnes array triées par jour (ordinal de la date) : ~17 octets par
+# relevé au lieu d'un dict de tuples.
+
+@lru_cache(maxsize=None)
+def day_ordinal(iso_date):
+    return date.fromisoformat(iso_date).toordinal()
+
+class PlayerSeries:
+    __slots__ = ("name", "server", "days", "points", "positions", "races")
+
+    def __init__(self, name, server):
+        self.name = name
+        self.server = server
+        self.days = array("i")
+        self.points = array("q")
+        self.positions = array("i")
+        self.races = array("B")  # index dans la table des races du build
+
+    def set(self, day, points, position, race):
+        """Enregistre un relevé ; un second relevé le même jour remplace le premier"""
+        i = len(self.days)
+        if i and self.days[-1] >= day:
+            i = bisect_left(self.days, day)
+            if self.days[i] == day:
+                self.points[i] = points
+                self.positions[i] = position
+                self.races[i] = race
+                return
+        self.days.insert(i, day)
+        self.points.insert(i, points)
+        self.positions.insert(i, position)
+        self.races.insert(i, race)
+
+    def get(self, day):
+        """(points, position, race) au jour donné, ou None"""
+        i = bisect_left(self.days, day)
+        if i < len(self.days) and self.days[i] == day:
+            return self.points[i], self.positions[i], self.races[i]
+        return None
+
+    def __len__(self):
+        return len(self.days)
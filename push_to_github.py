@@ -1,50 +1,96 @@
 import os
 import subprocess
+import sys
+
+import instrumentation
+from fingerprint import BUILD_RECORD, PUSH_RECORD, changed_files, load_record, save_record
 
 # =====================
 # CONFIG
 # =====================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-os.chdir(BASE_DIR)  # S'assurer qu'on est dans le bon dossier
 
 GIT_BRANCH = "main"  # ta branche actuelle
 COMMIT_MESSAGE = "Mise à jour du classement BloodWars"
 
+EXIT_OK = 0
+EXIT_NO_BUILD = 1
+EXIT_GIT_ERROR = 2
+
 # =====================
 # FONCTIONS
 # =====================
 def run(cmd):
-    """Exécute une commande shell et affiche la sortie"""
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    """Exécute une commande shell dans le dépôt et affiche la sortie"""
+    with instrumentation.span("git." + cmd.split()[1]):
+        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, cwd=BASE_DIR)
     if result.stdout:
         print(result.stdout)
     if result.stderr:
         print(result.stderr)
     return result.returncode
 
-# =====================
-# AJOUTER LES MODIFICATIONS
-# =====================
-print("📌 Ajout des fichiers modifiés...")
-run("git add .")
+def stage(command, paths):
+    """Lance `command -- chemins` par lots, pour des lignes de commande de taille raisonnable"""
+    for i in range(0, len(paths), 100):
+        if run(f"{command} -- " + " ".join(f'"{p}"' for p in paths[i:i + 100])) != 0:
+            return False
+    return True
 
 # =====================
-# Vérifier s'il y a quelque chose à commit
+# MAIN
 # =====================
-status_output = subprocess.getoutput("git status --porcelain")
-if not status_output.strip():
-    print("ℹ️ Aucun changement à pousser.")
-else:
-    # =====================
-    # COMMIT
-    # =====================
-    print("📦 Commit des modifications...")
-    run(f'git commit -m "{COMMIT_MESSAGE}"')
-
-    # =====================
-    # PUSH
-    # =====================
+def main():
+    with instrumentation.run("push_to_github") as stage:
+        return stage.exit(push())
+
+def push():
+    # generate_site.py liste les fichiers produits avec leur empreinte : seuls
+    # ceux qui ont changé depuis le dernier push sont ajoutés, sans parcourir
+    # tout le dépôt.
+    build_record = os.path.join(BASE_DIR, BUILD_RECORD)
+    push_record = os.path.join(BASE_DIR, PUSH_RECORD)
+
+    build = load_record(build_record)
+    if not build:
+        print("❌ Aucun build enregistré, lancez d'abord generate_site.py")
+        return EXIT_NO_BUILD
+
+    pushed = load_record(push_record)
+    changed, removed = changed_files(build["files"], pushed.get("files", {}))
+    if not changed and not removed:
+        print("ℹ️ Aucun changement à pousser.")
+        return EXIT_OK
+
+    # ---------- Ajouter les modifications ----------
+    print(f"📌 Ajout de {len(changed)} fichier(s) modifié(s) et {len(removed)} supprimé(s)...")
+    instrumentation.count("files_staged", len(changed) + len(removed))
+    if not stage("git add -A", changed):
+        return EXIT_GIT_ERROR
+    # Un fichier supprimé peut ne plus être suivi (suppression déjà commitée par
+    # un lancement dont le push a échoué) : git add échouerait sur ce chemin
+    if not stage("git rm -r --cached --ignore-unmatch --quiet", removed):
+        return EXIT_GIT_ERROR
+
+    # ---------- Commit ----------
+    # Rien d'indexé : déjà commité lors d'un lancement dont le push a échoué
+    with instrumentation.span("git.diff"):
+        staged = subprocess.run("git diff --cached --quiet", shell=True, cwd=BASE_DIR).returncode != 0
+    if staged:
+        print("📦 Commit des modifications...")
+        if run(f'git commit -m "{COMMIT_MESSAGE}"') != 0:
+            return EXIT_GIT_ERROR
+
+    # ---------- Push ----------
     print(f"🚀 Push vers la branche {GIT_BRANCH}...")
-    run(f"git push origin {GIT_BRANCH}")
+    if run(f"git push origin {GIT_BRANCH}") != 0:
+        print("❌ Push refusé, il sera retenté au prochain lancement")
+        return EXIT_GIT_ERROR
+
+    save_record(push_record, {"files": build["files"]})
+    print("✅ Push terminé, le site devrait être à jour sur GitHub Pages !")
+    return EXIT_OK
+
 
-    print("✅ Push terminé, le site devrait être à jour sur GitHub Pages !")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
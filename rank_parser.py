@@ -0,0 +1,142 @@
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+# =====================
+# PARSING DU CLASSEMENT
+# =====================
+# Transforme le HTML d'une page ?a=rank (page_source Selenium ou réponse HTTP)
+# en lignes structurées, en un seul passage sur le document.
+
+RankRow = namedtuple("RankRow", ["position", "name", "race", "points"])
+
+# has_header : la ligne d'en-tête du tableau (que des <th>) est présente, la
+# page est bien un classement même sans aucune ligne.
+# last_page : plus grand numéro de page des liens ?a=rank&page=N, ou None.
+RankPage = namedtuple("RankPage", ["rows", "rejected", "has_header", "last_page"])
+
+ROW_START = re.compile(r"^\d+\.")
+PAGE_LINK = re.compile(r"[?&]page=(\d+)")
+HEADER_CELLS = 3  # au moins autant de <th>, et aucun <td>
+
+class RaceMatcher:
+    """Reconnaît une ligne "12. Nom RACE 12345" en lisant depuis la droite
+
+    La race est toujours juste avant les points : on ne teste donc que les
+    derniers mots de la ligne, par simple recherche dans un dictionnaire.
+    """
+
+    def __init__(self, races):
+        self.races = {" ".join(r.split()).casefold(): r for r in races}
+        # Nombre de mots de chaque race, les plus longues d'abord
+        self.lengths = sorted({len(r.split()) for r in races}, reverse=True)
+
+    def match(self, text):
+        """Renvoie un RankRow, ou None si la ligne n'est pas reconnue"""
+        parts = text.split()
+        if not parts or not ROW_START.match(parts[0]):
+            return None
+
+        try:
+            position = int(parts[0].replace(".", ""))
+            points = int(parts[-1])
+        except ValueError:
+            return None
+
+        for n in self.lengths:
+            # Il faut au moins un mot de nom entre la position et la race
+            if len(parts) < n + 3:
+                continue
+            race = self.races.get(" ".join(parts[-1 - n:-1]).casefold())
+            if race is not None:
+                return RankRow(position, " ".join(parts[1:-1 - n]), race, points)
+
+        return None
+
+class RankTableParser(HTMLParser):
+    """Découpe le document en lignes <tr> et classe chacune dès sa fermeture
+
+    Comme dans un navigateur, une ligne dont le </tr> est omis se ferme au
+    <tr> suivant du même tableau, ou à la fin de sa section ou de son tableau.
+    """
+
+    def __init__(self, matcher):
+        super().__init__(convert_charrefs=True)
+        self.matcher = matcher
+        self.rows = []
+        self.rejected = []
+        self.has_header = False
+        self.pages = set()
+        self._row_stack = []  # [profondeur de tableau, morceaux de texte, nb <th>, nb <td>]
+        self._depth = 0
+        self._skip = 0
+
+    def _close_rows(self, depth):
+        """Ferme les lignes encore ouvertes à cette profondeur de tableau ou plus bas"""
+        while self._row_stack and self._row_stack[-1][0] >= depth:
+            self._classify(*self._row_stack.pop()[1:])
+
+    def _classify(self, parts, headers, cells):
+        if headers >= HEADER_CELLS and not cells:
+            self.has_header = True
+            return
+        text = " ".join("".join(parts).split())
+        if not ROW_START.match(text):
+            return  # en-tête ou ligne de mise en page
+        row = self.matcher.match(text)
+        if row is None:
+            self.rejected.append(text)
+        else:
+            self.rows.append(row)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag == "table":
+            self._depth += 1
+        elif tag == "tr":
+            self._close_rows(self._depth)
+            self._row_stack.append([self._depth, [], 0, 0])
+        elif tag in ("thead", "tbody", "tfoot"):
+            self._close_rows(self._depth)
+        elif tag in ("td", "th", "br") and self._row_stack:
+            row = self._row_stack[-1]
+            row[1].append(" ")
+            if tag == "th":
+                row[2] += 1
+            elif tag == "td":
+                row[3] += 1
+        elif tag == "a":
+            href = dict(attrs).get("href") or ""
+            found = PAGE_LINK.search(href)
+            if found and "a=rank" in href:
+                self.pages.add(int(found.group(1)))
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(0, self._skip - 1)
+        elif tag == "table":
+            self._close_rows(self._depth)
+            self._depth = max(0, self._depth - 1)
+        elif tag in ("tr", "thead", "tbody", "tfoot"):
+            self._close_rows(self._depth)
+
+    def handle_data(self, data):
+        if not self._skip and self._row_stack:
+            self._row_stack[-1][1].append(data)
+
+    def close(self):
+        super().close()
+        self._close_rows(0)  # document tronqué : lignes jamais fermées
+
+def read_rank_page(html, matcher):
+    """Renvoie un RankPage : lignes, lignes rejetées, en-tête présent, dernière page du pager"""
+    parser = RankTableParser(matcher)
+    parser.feed(html)
+    parser.close()
+    return RankPage(parser.rows, parser.rejected, parser.has_header, max(parser.pages, default=None))
+
+def parse_ranking(html, matcher):
+    """Renvoie (lignes reconnues, textes des lignes de classement non reconnues)"""
+    page = read_rank_page(html, matcher)
+    return page.rows, page.rejected
@@ -1,16 +1,19 @@
 import os
+import sys
 import time
-import re
 import csv
+import queue
 from datetime import date
 from collections import Counter
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
+import instrumentation
+from fetch_scheduler import PageScheduler
+from rank_parser import RaceMatcher, read_rank_page
+from checkpoint import Checkpoint, existing_keys
+from columnar_store import HistoryStore, csv_to_store
+from history_db import HistoryDB, import_csv
 
 # =====================
 # CONFIG SERVEURS
@@ -103,31 +106,66 @@ SERVERS = [
 # CSV
 # =====================
 
-CSV_PATH = r"C:\Users\Julien\Desktop\bots\burns-20.github.io\bloodwars_classement.csv"
+# À côté des scripts (le dépôt du site), sous Windows comme sous Linux
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(BASE_DIR, "bloodwars_classement.csv")
+CSV_FIELDS = ["date", "server", "position", "name", "race", "points"]
+MANIFEST_PATH = os.path.join(os.path.dirname(CSV_PATH), "scrape_manifest.json")
+HISTORY_DIR = os.path.join(os.path.dirname(CSV_PATH), "history")
+DB_PATH = os.path.join(os.path.dirname(CSV_PATH), "bloodwars.sqlite")
 TODAY = date.today().isoformat()
 
+# Pages lues par royaume : BW_PAGES=4 (défaut, le top 200) ou BW_PAGES=all
+# pour tout le classement, dont la dernière page est alors détectée
+DEFAULT_PAGES = 4
+
 # =====================
 # ENV
 # =====================
-load_dotenv()
+# Lu au lancement de main() (après le .env) : importer le module, depuis
+# pipeline.py par exemple, ne touche pas à l'environnement.
+def load_settings():
+    # Import ici : benchmark.py lit SERVERS sans python-dotenv installé
+    from dotenv import load_dotenv
+    load_dotenv()
+    return {
+        # Nombre max de sessions (navigateur ou HTTP) ouvertes en même temps, une par royaume.
+        # BW_MAX_WORKERS=1 retrouve l'ancien comportement séquentiel.
+        "max_workers": max(1, int(os.getenv("BW_MAX_WORKERS", len(SERVERS)))),
+        # Base SQLite optionnelle : alimentée si elle existe déjà ou si BW_SQLITE=1
+        "use_sqlite": os.getenv("BW_SQLITE") == "1" or os.path.isfile(DB_PATH),
+        # "auto" : HTTP direct, puis Firefox si la connexion HTTP échoue
+        # "http" / "selenium" : forcer un backend
+        "backend": os.getenv("BW_BACKEND", "auto"),
+        # None : classement complet
+        "pages": None if os.getenv("BW_PAGES") == "all" else int(os.getenv("BW_PAGES", DEFAULT_PAGES)),
+        # Par serveur : pages/s en régime établi, rafale autorisée, requêtes en vol
+        # au plus (Firefox : toujours une), nouvelles tentatives par page
+        "rate": float(os.getenv("BW_RATE", "2")),
+        "burst": int(os.getenv("BW_BURST", "4")),
+        "concurrency": max(1, int(os.getenv("BW_PAGE_CONCURRENCY", "4"))),
+        "retries": max(0, int(os.getenv("BW_RETRIES", "3"))),
+        # Dossier où enregistrer le HTML brut de chaque page lue (fixtures des
+        # tests : tests/fixtures/captured/), désactivé si vide
+        "capture_dir": os.getenv("BW_CAPTURE_DIR") or None,
+    }
 
 # =====================
-# DRIVER
+# BACKENDS
 # =====================
-options = Options()
-driver = webdriver.Firefox(options=options)
-wait = WebDriverWait(driver, 20)
+def make_backend(name, server):
+    """Un backend expose login(login, password), fetch_rank_page(page) et close()"""
+    if name == "http":
+        from http_backend import HttpBackend
+        return HttpBackend(server)
+    if name == "selenium":
+        from selenium_backend import SeleniumBackend
+        return SeleniumBackend(server)
+    raise ValueError(f"Backend inconnu : {name}")
 
 # =====================
 # UTILS
 # =====================
-def is_connected():
-    if driver.find_elements(By.NAME, "login"):
-        return False
-    if driver.find_elements(By.NAME, "password"):
-        return False
-    return True
-
 def get_credentials(server_code):
     login = os.getenv(f"BW_{server_code}_LOGIN")
     password = os.getenv(f"BW_{server_code}_PASSWORD")
@@ -135,110 +173,294 @@ def get_credentials(server_code):
         raise Exception(f"❌ Identifiants manquants pour {server_code}")
     return login, password
 
-# =====================
-# CSV INIT
-# =====================
-file_exists = os.path.isfile(CSV_PATH)
-csv_file = open(CSV_PATH, "a", newline="", encoding="utf-8")
-writer = csv.DictWriter(
-    csv_file,
-    fieldnames=["date", "server", "position", "name", "race", "points"],
-    delimiter=";",
-    quoting=csv.QUOTE_ALL
-)
-
-if not file_exists:
-    writer.writeheader()
+def capture_page(directory, server_code, page, html):
+    """Enregistre le HTML tel que reçu, en <serveur>_<page>.html comme benchmark.py --pages"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{server_code}_{page}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
 
 # =====================
-# MAIN LOOP
+# SCRAPING D'UN SERVEUR
 # =====================
-for server in SERVERS:
+def connect(server, backend_name="auto"):
+    """Renvoie un backend connecté au serveur, ou None"""
     SERVER_CODE = server["code"]
-    PORTAL_URL = server["portal"]
-    SERVER_URL = server["server_url"]
-    REALM_VALUE = server["realm"]
-    RACES = server["races"]
-
-    LOGIN, PASSWORD = get_credentials(SERVER_CODE)
-
-    print(f"\n🌍 Ouverture portail {SERVER_CODE}")
-    driver.get(PORTAL_URL)
-
-    wait.until(EC.presence_of_element_located((By.NAME, "login")))
-
-    Select(driver.find_element(By.ID, "i_realm")).select_by_value(REALM_VALUE)
-    driver.find_element(By.NAME, "login").send_keys(LOGIN)
-    driver.find_element(By.NAME, "password").send_keys(PASSWORD)
-    driver.find_element(By.XPATH, "//input[@type='submit']").click()
-
-    time.sleep(3)
-
-    links = driver.find_elements(By.XPATH, "//a[contains(text(),'Cliquez ici')]")
-    if links:
-        driver.execute_script("arguments[0].click();", links[0])
-        time.sleep(3)
-
-    print(f"📍 URL actuelle : {driver.current_url}")
-
-    if not driver.current_url.startswith(SERVER_URL):
-        print(f"❌ Échec connexion {SERVER_CODE}")
-        continue
-
-    if not is_connected():
-        print(f"❌ Toujours sur un formulaire ({SERVER_CODE})")
-        continue
-
-    print(f"✅ Connecté au serveur {SERVER_CODE}")
-
-    for page in range(1, 5):
-        print(f"📊 Lecture classement page {page}")
-        driver.get(f"{SERVER_URL}/?a=rank&page={page}")
-        time.sleep(3)
-
-        rows = driver.find_elements(By.XPATH, "//tr")
-
-        for row in rows:
-            text = row.text.strip()
-            if not text or text.startswith("PLACE NOM") or not re.match(r"^\d+\.", text):
-                continue
-
-            parts = text.split()
-
-            try:
-                position = int(parts[0].replace(".", ""))
-                points = int(parts[-1])
-
-                race = None
-                race_index = None
-                for r in RACES:
-                    r_parts = r.split()
-                    for i in range(len(parts)):
-                        if parts[i:i+len(r_parts)] == r_parts:
-                            race = r
-                            race_index = i
-                            break
-                    if race:
-                        break
-
-                if race is None:
-                    continue
-
-                name = " ".join(parts[1:race_index])
-
-                writer.writerow({
+    login, password = get_credentials(SERVER_CODE)
+    names = ["http", "selenium"] if backend_name == "auto" else [backend_name]
+
+    for name in names:
+        try:
+            backend = make_backend(name, server)
+        except ImportError as e:
+            print(f"⚠️ [{SERVER_CODE}] Backend {name} indisponible : {e}")
+            continue
+
+        try:
+            if backend.login(login, password):
+                return backend
+        except Exception as e:
+            print(f"⚠️ [{SERVER_CODE}] Backend {name} en échec : {e}")
+        backend.close()
+
+    return None
+
+def scrape_server(server, pages, emit, settings):
+    """Scrape les pages demandées d'un royaume dans sa propre session
+
+    pages=None : tout le classement, jusqu'à la dernière page détectée.
+    Chaque page terminée est transmise à emit(page, rows), dans l'ordre ;
+    renvoie la dernière page du classement si elle a été détectée, sinon None.
+    """
+    SERVER_CODE = server["code"]
+    matcher = RaceMatcher(server["races"])
+
+    with instrumentation.span(f"login.{SERVER_CODE}"):
+        backend = connect(server, settings["backend"])
+    if backend is None:
+        # Compté comme une erreur par scrape_all : le script sort en 1 ou 2
+        raise Exception(f"Échec connexion {SERVER_CODE} (aucun backend connecté)")
+
+    discover = pages is None
+    ladder = {"page_size": None, "last_position": 0, "last_page": None}
+
+    def fetch(page):
+        """RankPage de la page ; lève une erreur si ce n'est pas une page de classement"""
+        print(f"📊 [{SERVER_CODE}] Lecture classement page {page}")
+        with instrumentation.span(f"fetch_page.{SERVER_CODE}"):
+            html = backend.fetch_rank_page(page)
+        if settings.get("capture_dir"):
+            capture_page(settings["capture_dir"], SERVER_CODE, page, html)
+        with instrumentation.span("parse"):
+            parsed = read_rank_page(html, matcher)
+        instrumentation.count("pages_fetched")
+        instrumentation.count("bytes_downloaded", len(html.encode("utf-8")))
+        instrumentation.count("rows_parsed", len(parsed.rows))
+        instrumentation.count("rows_rejected", len(parsed.rejected))
+
+        # Session expirée ou page d'erreur : jamais cochée, le scheduler réessaie.
+        # Seul un tableau de classement vide (en-tête sans ligne), au-delà de
+        # la première page et en lecture complète, marque la fin du classement.
+        if not parsed.rows and not parsed.rejected and not (discover and page > 1 and parsed.has_header):
+            raise Exception(f"page {page} sans ligne de classement")
+        return parsed
+
+    # Une seule page à la fois dans un même Firefox
+    scheduler = PageScheduler(
+        SERVER_CODE, fetch, settings["rate"], settings["burst"],
+        min(settings["concurrency"], getattr(backend, "max_concurrency", 1)), settings["retries"],
+    )
+
+    def handle(page, parsed):
+        rows, rejected = parsed.rows, parsed.rejected
+        # Lignes de classement de la page, reconnues ou non : une ligne rejetée
+        # ne doit pas faire passer la page pour la dernière
+        size = len(rows) + len(rejected)
+        if discover and page > 1 and (not size or (rows and rows[0].position <= ladder["last_position"])):
+            # Tableau vide ou qui répète la fin : le classement s'arrêtait à la précédente
+            ladder["last_page"] = page - 1
+            return False
+
+        if rejected:
+            print(f"⚠️ [{SERVER_CODE}] Page {page} : {len(rejected)} ligne(s) non reconnue(s)")
+            for text in rejected[:5]:
+                print(f"   ↳ {text}")
+
+        emit(page, [
+                {
                     "date": TODAY,
                     "server": SERVER_CODE,
-                    "position": position,
-                    "name": name,
-                    "race": race,
-                    "points": points
-                })
+                    "position": row.position,
+                    "name": row.name,
+                    "race": row.race,
+                    "points": row.points
+                }
+                for row in rows
+            ])
+
+        if discover:
+            if page == 1:
+                ladder["page_size"] = size
+            if rows:
+                ladder["last_position"] = rows[-1].position
+            # Page incomplète, ou pager sans lien vers une page suivante : c'est la dernière
+            if size < ladder["page_size"] or (parsed.last_page is not None and parsed.last_page <= page):
+                ladder["last_page"] = page
+                return False
+        return True
+
+    try:
+        scheduler.run(count(1) if discover else pages, handle)
+    finally:
+        backend.close()
+
+    if ladder["last_page"] is not None:
+        print(f"🏁 [{SERVER_CODE}] Classement complet : {ladder['last_page']} page(s)")
+    return ladder["last_page"]
 
-            except Exception:
+# =====================
+# MAIN
+# =====================
+EXIT_OK = 0
+EXIT_FAILED = 1   # aucun serveur scrapé
+EXIT_PARTIAL = 2  # au moins un serveur en échec, les autres sont écrits
+
+def main(on_server_done=None):
+    """Scrape les pages manquantes du jour ; renvoie EXIT_OK, EXIT_PARTIAL ou EXIT_FAILED
+
+    on_server_done(code) est appelé dès qu'un serveur est terminé et ses
+    lignes écrites (pipeline.py s'en sert pour lancer la génération).
+    """
+    with instrumentation.run("scrap_classement") as stage:
+        return stage.exit(scrape_all(on_server_done))
+
+def pending_pages(checkpoint, code, settings):
+    """Pages encore à lire aujourd'hui ; None : classement complet, fin pas encore connue"""
+    if settings["pages"] is not None:
+        return checkpoint.pending_pages(TODAY, code, range(1, settings["pages"] + 1))
+    last = checkpoint.last_page(TODAY, code)
+    if last is None:
+        return None
+    return checkpoint.pending_pages(TODAY, code, range(1, last + 1))
+
+def open_history_store(csv_exists):
+    """Partitions history/, avec tout l'historique du CSV importé au premier usage
+
+    Tant que l'import n'est pas noté dans le dictionnaire, generate_site.py
+    continue de lire le CSV : des partitions ne contenant que les jours
+    scrapés depuis ne remplacent jamais l'historique complet.
+    """
+    store = HistoryStore(HISTORY_DIR)
+    if store.imported:
+        return store
+    if csv_exists:
+        print("📦 Import de l'historique CSV dans history/ (une seule fois)")
+        with instrumentation.span("import_history"):
+            count = csv_to_store(CSV_PATH, HISTORY_DIR)
+        print(f"📦 {count} partitions importées")
+        return HistoryStore(HISTORY_DIR)
+    store.mark_imported()  # pas encore d'historique : rien à importer
+    return store
+
+def write_sqlite(run_rows):
+    """Lignes du jour dans la base ; à sa création, tout le CSV (lignes du jour comprises)"""
+    with instrumentation.span("write_sqlite"):
+        db = HistoryDB(DB_PATH)
+        imported = db.imported()
+        if imported and run_rows:
+            db.write_rows(run_rows)
+        db.close()
+        if not imported:
+            print(f"📦 Import de l'historique CSV dans {os.path.basename(DB_PATH)} (une seule fois)")
+            count = import_csv(CSV_PATH, DB_PATH)
+            print(f"🗄️ {count} lignes dans {os.path.basename(DB_PATH)}")
+            return
+    if run_rows:
+        print(f"🗄️ {len(run_rows)} lignes enregistrées dans {os.path.basename(DB_PATH)}")
+
+def scrape_all(on_server_done):
+    started = time.perf_counter()
+    settings = load_settings()
+
+    checkpoint = Checkpoint(MANIFEST_PATH)
+    pending = {server["code"]: pending_pages(checkpoint, server["code"], settings) for server in SERVERS}
+    todo = [server for server in SERVERS if pending[server["code"]] != []]
+
+    for server in SERVERS:
+        if pending[server["code"]] == []:
+            print(f"⏭️ {server['code']} : déjà scrapé aujourd'hui")
+
+    if not todo:
+        print("\n✅ Rien à faire – toutes les pages du jour sont déjà dans le CSV")
+        return EXIT_OK
+
+    # Lignes du jour déjà présentes (relance après un crash) : jamais réécrites
+    seen = existing_keys(CSV_PATH, TODAY)
+
+    file_exists = os.path.isfile(CSV_PATH)
+    store = open_history_store(file_exists)
+
+    csv_size = os.path.getsize(CSV_PATH) if file_exists else 0
+    csv_file = open(CSV_PATH, "a", newline="", encoding="utf-8")
+    writer = csv.DictWriter(
+        csv_file,
+        fieldnames=CSV_FIELDS,
+        delimiter=";",
+        quoting=csv.QUOTE_ALL
+    )
+
+    if not file_exists:
+        writer.writeheader()
+
+    run_rows = []
+
+    workers = min(settings["max_workers"], len(todo))
+    print(f"🚀 Scraping de {len(todo)} serveurs ({workers} en parallèle)")
+
+    # Les workers ne font que lire : ils envoient leurs pages dans la file et
+    # seul le thread principal écrit dans le CSV puis coche le manifeste
+    pages_queue = queue.Queue()
+
+    def emitter(code):
+        return lambda page, rows: pages_queue.put(("page", code, (page, rows)))
+
+    errors = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for server in todo:
+            code = server["code"]
+            future = pool.submit(scrape_server, server, pending[code], emitter(code), settings)
+            future.add_done_callback(lambda f, code=code: pages_queue.put(("done", code, f)))
+
+        finished = 0
+        while finished < len(todo):
+            kind, code, payload = pages_queue.get()
+
+            if kind == "done":
+                finished += 1
+                try:
+                    last_page = payload.result()
+                    if last_page is not None:
+                        checkpoint.set_last_page(TODAY, code, last_page)
+                except Exception as e:
+                    errors += 1
+                    print(f"❌ Erreur sur {code} : {e}")
+                if on_server_done is not None:
+                    on_server_done(code)
                 continue
 
-csv_file.close()
-driver.quit()
-
-print("\n✅ Scraping terminé – CSV mis à jour")
\ No newline at end of file
+            page, rows = payload
+            fresh = [r for r in rows if (code, r["position"]) not in seen]
+            seen.update((code, r["position"]) for r in fresh)
+            with instrumentation.span("write_csv"):
+                writer.writerows(fresh)
+                csv_file.flush()
+            with instrumentation.span("write_history"):
+                store.merge_partition(TODAY, code, rows)
+            run_rows.extend(rows)
+            checkpoint.mark(TODAY, code, page)
+            instrumentation.count("rows_written", len(fresh))
+            instrumentation.count("rows_skipped", len(rows) - len(fresh))
+            print(f"💾 {code} page {page} : {len(fresh)} lignes écrites")
+
+    csv_file.close()
+    instrumentation.count("bytes_written", os.path.getsize(CSV_PATH) - csv_size)
+
+    if settings["use_sqlite"]:
+        write_sqlite(run_rows)
+
+    missing = {code: pending_pages(checkpoint, code, settings) for code in pending}
+    for code, pages in missing.items():
+        if pages is None:
+            print(f"⚠️ {code} : fin du classement non atteinte, relancer le script pour la reprendre")
+        elif pages:
+            print(f"⚠️ {code} : pages manquantes {pages}, relancer le script pour les reprendre")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Scraping terminé – CSV mis à jour ({elapsed:.1f}s)")
+    if not errors:
+        return EXIT_OK
+    return EXIT_FAILED if errors == len(todo) else EXIT_PARTIAL
+
+
+if __name__ == "__main__":
+    sys.exit(main())
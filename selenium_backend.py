@@ -0,0 +1,128 @@
+import time
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.support.ui import WebDriverWait, Select
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+import instrumentation
+
+# =====================
+# ATTENTES
+# =====================
+# Délai max (secondes) par étape : on avance dès que la condition est remplie
+TIMEOUTS = {
+    "login_form": 20,
+    "after_submit": 15,
+    "redirect": 15,
+    "rank_table": 15,
+}
+POLL_FREQUENCY = 0.1
+
+CLICK_HERE_XPATH = "//a[contains(text(),'Cliquez ici')]"
+RANK_TABLE_XPATH = "//tr[td]"
+
+# =====================
+# DRIVER
+# =====================
+def new_driver():
+    """Ouvre une session Firefox isolée (un profil par worker)"""
+    options = Options()
+    return webdriver.Firefox(options=options)
+
+def wait_for(driver, step, condition, timings):
+    """Attend une condition avec le délai de l'étape et note le temps passé"""
+    started = time.perf_counter()
+    try:
+        WebDriverWait(driver, TIMEOUTS[step], poll_frequency=POLL_FREQUENCY).until(condition)
+        ok = True
+    except TimeoutException:
+        ok = False
+    elapsed = time.perf_counter() - started
+    timings.append((step, elapsed, ok))
+    instrumentation.record(f"wait.{step}", elapsed)
+    return ok
+
+def on_server(server_url):
+    return lambda d: d.current_url.startswith(server_url)
+
+def on_server_or_redirect(server_url):
+    return lambda d: d.current_url.startswith(server_url) or d.find_elements(By.XPATH, CLICK_HERE_XPATH)
+
+def format_timings(timings):
+    return ", ".join(
+        f"{step} {elapsed:.2f}s" + ("" if ok else " (timeout)")
+        for step, elapsed, ok in timings
+    )
+
+# =====================
+# BACKEND
+# =====================
+class SeleniumBackend:
+    """Navigation dans un vrai Firefox : lent mais proche d'un joueur"""
+
+    name = "selenium"
+    max_concurrency = 1
+
+    def __init__(self, server):
+        self.server = server
+        self.timings = []
+        self.driver = new_driver()
+
+    def is_connected(self):
+        if self.driver.find_elements(By.NAME, "login"):
+            return False
+        if self.driver.find_elements(By.NAME, "password"):
+            return False
+        return True
+
+    def login(self, login, password):
+        driver = self.driver
+        SERVER_CODE = self.server["code"]
+        SERVER_URL = self.server["server_url"]
+
+        print(f"\n🌍 Ouverture portail {SERVER_CODE} (selenium)")
+        driver.get(self.server["portal"])
+
+        if not wait_for(driver, "login_form", EC.presence_of_element_located((By.NAME, "login")), self.timings):
+            print(f"❌ Formulaire de connexion introuvable ({SERVER_CODE})")
+            return False
+
+        Select(driver.find_element(By.ID, "i_realm")).select_by_value(self.server["realm"])
+        driver.find_element(By.NAME, "login").send_keys(login)
+        driver.find_element(By.NAME, "password").send_keys(password)
+        driver.find_element(By.XPATH, "//input[@type='submit']").click()
+
+        # Soit on arrive directement sur le serveur, soit le portail propose "Cliquez ici"
+        wait_for(driver, "after_submit", on_server_or_redirect(SERVER_URL), self.timings)
+
+        links = driver.find_elements(By.XPATH, CLICK_HERE_XPATH)
+        if links and not driver.current_url.startswith(SERVER_URL):
+            driver.execute_script("arguments[0].click();", links[0])
+            wait_for(driver, "redirect", on_server(SERVER_URL), self.timings)
+
+        print(f"📍 [{SERVER_CODE}] URL actuelle : {driver.current_url}")
+
+        if not driver.current_url.startswith(SERVER_URL):
+            print(f"❌ Échec connexion {SERVER_CODE}")
+            return False
+
+        if not self.is_connected():
+            print(f"❌ Toujours sur un formulaire ({SERVER_CODE})")
+            return False
+
+        print(f"✅ Connecté au serveur {SERVER_CODE}")
+        return True
+
+    def fetch_rank_page(self, page):
+        """Renvoie le HTML de la page de classement (un seul aller-retour WebDriver)"""
+        self.driver.get(f"{self.server['server_url']}/?a=rank&page={page}")
+        wait_for(self.driver, "rank_table", EC.presence_of_element_located((By.XPATH, RANK_TABLE_XPATH)), self.timings)
+        return self.driver.page_source
+
+    def close(self):
+        self.driver.quit()
+        if self.timings:
+            print(f"⏱️ [{self.server['code']}] Attentes : {format_timings(self.timings)}")
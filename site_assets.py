@@ -0,0 +1,148 @@
+import base64
+import gzip
+import hashlib
+import os
+import re
+import urllib.request
+
+import instrumentation
+
+try:
+    import brotli
+except ImportError:  # optionnel : seules les variantes .gz sont produites
+    brotli = None
+
+# =====================
+# FICHIERS STATIQUES DU SITE
+# =====================
+# Chaque fichier est publié sous un nom qui contient le hash de son contenu
+# (app.3f2a9c1b0d.js) : le navigateur peut le garder en cache indéfiniment,
+# seul un fichier dont le contenu change reçoit un nouveau nom.
+
+HASHED_NAME = re.compile(r"^[\w.-]+\.[0-9a-f]{10}\.\w+(\.gz|\.br)?$")
+HASH_PART = re.compile(r"\.[0-9a-f]{10}(?=\.\w+$)")
+COMPRESSED = (".gz", ".br")
+CSS_URL = re.compile(r"url\(\s*['\"]?([^'\")]+)['\"]?\s*\)")
+MIME_TYPES = {".png": "image/png", ".gif": "image/gif", ".svg": "image/svg+xml"}
+
+def content_hash(payload):
+    return hashlib.sha1(payload).hexdigest()[:10]
+
+def write_atomic(path, payload):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    instrumentation.count("bytes_written", len(payload))
+
+def write_hashed(directory, name, payload):
+    """Écrit `payload` sous name.<hash>.ext et renvoie ce nom de fichier"""
+    stem, ext = os.path.splitext(name)
+    filename = f"{stem}.{content_hash(payload)}{ext}"
+    path = os.path.join(directory, filename)
+    if not os.path.isfile(path):  # même nom = même contenu
+        os.makedirs(directory, exist_ok=True)
+        write_atomic(path, payload)
+    return filename
+
+def prune(directory, keep):
+    """Supprime les anciens fichiers hashés du dossier qui ne sont plus référencés"""
+    if not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for name in os.listdir(directory):
+        base = name[:-3] if name.endswith(COMPRESSED) else name
+        if HASHED_NAME.match(name) and base not in keep:
+            os.remove(os.path.join(directory, name))
+            removed += 1
+    return removed
+
+# =====================
+# BIBLIOTHÈQUES TIERCES
+# =====================
+def fetch_vendor(path, url, timeout=30):
+    """Télécharge une fois la copie locale `path` de `url` ; renvoie True si elle existe"""
+    if os.path.isfile(path):
+        return True
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            payload = response.read()
+    except OSError as e:
+        print(f"⚠️ {os.path.basename(path)} non téléchargé ({e}) : la page pointe vers {url}")
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, payload)
+    print(f"📥 {os.path.basename(path)} téléchargé depuis {url}")
+    return True
+
+# =====================
+# MINIFICATION
+# =====================
+# Volontairement prudente, sans dépendance : on ne retire que ce qui ne peut
+# pas changer le sens du code (commentaires, indentation, lignes vides).
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+def minify_js(js):
+    lines = []
+    for line in js.splitlines():
+        stripped = line.strip()
+        if stripped and not stripped.startswith("//"):
+            lines.append(stripped)
+    return "\n".join(lines) + "\n"
+
+def inline_css_urls(css, base_dir):
+    """Remplace les url(images) relatives par des data: URI (pas de chemin à préserver)"""
+    def repl(m):
+        url = m.group(1)
+        path = os.path.normpath(os.path.join(base_dir, url))
+        mime = MIME_TYPES.get(os.path.splitext(url)[1].lower())
+        if url.startswith("data:") or mime is None or not os.path.isfile(path):
+            return m.group(0)
+        with open(path, "rb") as f:
+            encoded = base64.b64encode(f.read()).decode("ascii")
+        return f'url("data:{mime};base64,{encoded}")'
+    return CSS_URL.sub(repl, css)
+
+# =====================
+# VARIANTES COMPRESSÉES
+# =====================
+# file.gz (et file.br si le module brotli est installé) à côté de chaque
+# fichier, pour un serveur qui sert directement les versions précompressées.
+def _compress_to(path, suffix, compress):
+    target = path + suffix
+    # Un fichier hashé ne change jamais : sa variante existante est à jour
+    if not os.path.isfile(target) or os.path.getmtime(target) < os.path.getmtime(path):
+        with open(path, "rb") as f:
+            write_atomic(target, compress(f.read()))
+    return os.path.getsize(target)
+
+def precompress(path):
+    """Écrit les variantes compressées ; renvoie {"raw", "gzip", "brotli"} en octets"""
+    sizes = {
+        "raw": os.path.getsize(path),
+        # mtime=0 : même contenu, même .gz (pas de faux changement au push)
+        "gzip": _compress_to(path, ".gz", lambda data: gzip.compress(data, 9, mtime=0)),
+        "brotli": None,
+    }
+    if brotli is not None:
+        sizes["brotli"] = _compress_to(path, ".br", lambda data: brotli.compress(data, quality=11))
+    return sizes
+
+def logical_name(relpath):
+    """assets/site.3f2a9c1b0d.js -> assets/site.js : même nom d'un build à l'autre"""
+    return HASH_PART.sub("", relpath.replace(os.sep, "/"))
+
+def format_size(size):
+    if size is None:
+        return "-"
+    return f"{size / 1024:.1f} Ko" if size >= 1024 else f"{size} o"
+
+def format_delta(size, previous):
+    if previous is None:
+        return "nouveau"
+    delta = size - previous
+    return f"{'+' if delta >= 0 else '-'}{format_size(abs(delta))}"
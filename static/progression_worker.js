@@ -0,0 +1,208 @@
+// Calcul de la progression hors du thread principal.
+// Publié dans assets/ par generate_site.py ; la page lui envoie
+// { type: 'init', manifest: URL absolue } puis un { type: 'update', ... } par changement
+// de filtre, de dates ou de preset, et reçoit en retour les
+// lignes prêtes pour DataTable.
+
+let siteData = null;
+let manifestUrl = null;          // les shards sont relatifs au manifest
+const shardCache = {};
+const dayIndex = {};             // index date -> Map(joueur -> [points, position, race])
+let windowCache = { key: null, entries: null };
+
+// Comme html.escape(..., quote=False) côté Python : la vue initiale
+// pré-rendue et les lignes calculées ici sont identiques au caractère près
+const HTML_ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;' };
+
+function escapeHtml(text) {
+    return String(text).replace(/[&<>]/g, c => HTML_ESCAPES[c]);
+}
+
+// Nom de la page joueur : même hash cyrb53 de "serveur/nom" que
+// player_key() dans generate_site.py
+function cyrb53(str) {
+    let h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+    for (let i = 0, ch; i < str.length; i++) {
+        ch = str.charCodeAt(i);
+        h1 = Math.imul(h1 ^ ch, 2654435761);
+        h2 = Math.imul(h2 ^ ch, 1597334677);
+    }
+    h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507);
+    h1 ^= Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+    h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507);
+    h2 ^= Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+    return 4294967296 * (2097151 & h2) + (h1 >>> 0);
+}
+
+function playerPageUrl(i) {
+    if (siteData.pageUrls[i] === undefined) {
+        const server = siteData.servers[i];
+        siteData.pageUrls[i] = `players/${server}/${cyrb53(server + '/' + siteData.names[i]).toString(16)}.html`;
+    }
+    return siteData.pageUrls[i];
+}
+
+// Inverse de l'encodage compact de generate_site.py : cumule les écarts
+function undelta(values) {
+    let acc = 0;
+    return values.map(v => acc += v);
+}
+
+function decodeManifest(raw) {
+    const players = raw.players;
+    const presets = {};
+    for (let mode in raw.presets) {
+        const p = raw.presets[mode];
+        const ids = undelta(p.player);
+        presets[mode] = {
+            start: p.start,
+            end: p.end,
+            entries: ids.map((i, k) => [
+                i, p.points[k], p.position[k], p.race[k],
+                p.gain[k] === null ? null : p.points[k] + p.gain[k],
+                p.end_position[k] === null ? null : p.position[k] + p.end_position[k],
+                p.end_race[k]
+            ])
+        };
+    }
+    // Index (nom, serveur) : un joueur = un entier, son serveur est résolu une fois
+    const names = players.player_name.map(n => players.names[n]);
+    const servers = players.player_server.map(s => players.servers[s]);
+    return {
+        dates: raw.dates,
+        races: raw.races,
+        serverNames: raw.server_names,
+        names: names,
+        servers: servers,
+        displayServers: servers.map(s => raw.server_names[s] || s),
+        presets: presets,
+        shards: raw.shards,
+        pageUrls: []                 // calculées à la première ligne affichée du joueur
+    };
+}
+
+// Remplit dayIndex pour chaque date du shard
+function indexShard(raw) {
+    raw.days.forEach(d => dayIndex[d] = new Map());
+    let player = 0, k = 0, r = 0;
+    for (let j = 0; j < raw.player.length; j++) {
+        player += raw.player[j];
+        let day = 0, points = 0, position = 0, race = 0, left = 0;
+        for (let c = 0; c < raw.count[j]; c++, k++) {
+            day += raw.day[k];
+            points += raw.points[k];
+            position += raw.position[k];
+            if (left === 0) {
+                race = raw.race[r++];
+                left = raw.race[r++];
+            }
+            left--;
+            dayIndex[raw.days[day]].set(player, [points, position, race]);
+        }
+    }
+}
+
+// Un shard par mois, téléchargé et indexé une seule fois
+function loadShard(month) {
+    if (!shardCache[month]) {
+        shardCache[month] = fetch(new URL(siteData.shards[month], manifestUrl)).then(r => r.json()).then(indexShard);
+    }
+    return shardCache[month];
+}
+
+async function dayMap(index) {
+    await loadShard(siteData.dates[index].slice(0, 7));
+    return dayIndex[index] || new Map();
+}
+
+// Début et fin de chaque joueur sur la période : seuls les mois concernés sont chargés
+async function windowEntries(start, end) {
+    const [startMap, endMap] = await Promise.all([dayMap(start), dayMap(end)]);
+    const entries = [];
+    for (const [i, s] of startMap) {
+        if (s[0] === 0) continue;
+        entries.push([i, ...s, ...(endMap.get(i) || [null, null, null])]);
+    }
+    return entries.sort((a, b) => a[0] - b[0]);
+}
+
+// La fenêtre courante est gardée : un changement de filtre ne relit aucun jour
+async function entriesFor(start, end) {
+    const key = start + ':' + end;
+    if (windowCache.key !== key) {
+        let entries = null;
+        for (let mode in siteData.presets) {
+            const preset = siteData.presets[mode];
+            if (preset.start === start && preset.end === end) entries = preset.entries;
+        }
+        windowCache = { key: key, entries: entries || await windowEntries(start, end) };
+    }
+    return windowCache.entries;
+}
+
+function buildRows(entries, selectedServers, selectedRaces) {
+    const races = siteData.races;
+    const raceOk = races.map(r => selectedRaces.has(r));
+
+    const tableData = [];
+    for (let [i, startScore, startPos, startRace, endScore, endPos, endRace] of entries) {
+        const server = siteData.servers[i];
+        if (!selectedServers.has(server) || !raceOk[startRace]) continue;
+
+        // La fin ne compte que si le joueur y est présent avec une race sélectionnée
+        const hasEnd = endScore !== null && raceOk[endRace];
+
+        // Race affichée
+        let raceDisplay = races[startRace];
+        if (hasEnd && races[endRace] !== raceDisplay) {
+            raceDisplay = raceDisplay + ' → ' + races[endRace];
+        }
+
+        // Position affichée
+        let posDisplay = '';
+        if (startPos && hasEnd && endPos && startPos !== endPos) {
+            posDisplay = `${startPos} → ${endPos}`;
+        } else if (hasEnd && endPos) {
+            posDisplay = `${endPos}`;
+        } else if (startPos) {
+            posDisplay = `${startPos}`;
+        }
+
+        const finalScore = hasEnd ? endScore : 0;
+        tableData.push([i, server, raceDisplay, startScore, finalScore, finalScore - startScore, posDisplay]);
+    }
+
+    const bestProgByServer = {};
+    for (const [, server, , , , prog] of tableData) {
+        if (!bestProgByServer[server] || prog > bestProgByServer[server]) {
+            bestProgByServer[server] = prog;
+        }
+    }
+
+    return tableData.map(([i, server, race, startScore, endScore, prog, position]) => {
+        const cls = prog === bestProgByServer[server] ? 'best-prog' : '';
+        return [
+            `<span class="${cls}"><a href="${playerPageUrl(i)}">${escapeHtml(siteData.names[i])}</a></span>`,
+            position,
+            siteData.displayServers[i],
+            race,
+            startScore,
+            endScore,
+            `<span class="${cls}">${prog}</span>`
+        ];
+    });
+}
+
+self.onmessage = async function (event) {
+    const msg = event.data;
+    if (msg.type === 'init') {
+        manifestUrl = msg.manifest;
+        const manifest = await fetch(manifestUrl).then(r => r.json());
+        siteData = decodeManifest(manifest);
+        self.postMessage({ type: 'ready' });
+    } else if (msg.type === 'update') {
+        const entries = await entriesFor(siteData.dates.indexOf(msg.start), siteData.dates.indexOf(msg.end));
+        const rows = buildRows(entries, new Set(msg.servers), new Set(msg.races));
+        self.postMessage({ type: 'rows', token: msg.token, rows: rows });
+    }
+};
@@ -0,0 +1,182 @@
+// Script de la page, publié minifié dans assets/ par generate_site.py.
+// MANIFEST_URL, WORKER_URL et PRESETS sont définis dans index.html :
+// ce sont les seules valeurs qui changent à chaque build.
+
+let workerReady = false;
+let pendingUpdate = false;
+let updateToken = 0;
+
+// Tout le calcul (shards, index par date et par joueur, filtres) vit dans le worker
+const worker = new Worker(WORKER_URL);
+
+worker.onmessage = function (event) {
+    const msg = event.data;
+    if (msg.type === 'ready') {
+        workerReady = true;
+        if (pendingUpdate) updateProgression();
+    } else if (msg.type === 'rows') {
+        if (msg.token !== updateToken) return;  // une mise à jour plus récente est en cours
+        showRows(msg.rows);
+    }
+};
+
+function showRows(rows) {
+    const dt = $('#progressTable').DataTable();
+    dt.clear();
+    dt.rows.add(rows);
+    dt.draw(false);
+    updateRaceStats();
+}
+
+// Presets compris : le worker a leurs entrées dans le manifest
+function updateProgression() {
+    const token = ++updateToken;
+    if (!workerReady) {
+        pendingUpdate = true;  // relancé dès que le worker a chargé le manifest
+        return;
+    }
+    pendingUpdate = false;
+    worker.postMessage({
+        type: 'update',
+        token: token,
+        servers: Array.from(document.querySelectorAll('.server-filter:checked')).map(cb => cb.value),
+        races: Array.from(document.querySelectorAll('.race-filter:checked')).map(cb => cb.value),
+        start: document.getElementById('date_start').value,
+        end: document.getElementById('date_end').value
+    });
+}
+
+function setActiveMode(mode) {
+    ['last1','last7','last30','alltime'].forEach(id => {
+        document.getElementById(id).classList.remove('active');
+    });
+
+    if (mode) {
+        document.getElementById(mode).classList.add('active');
+    }
+}
+
+function setActivePageSize(size) {
+    document.querySelectorAll('#pageSizeButtons button').forEach(btn => {
+        btn.classList.remove('active');
+        if (btn.dataset.size == size) {
+            btn.classList.add('active');
+        }
+    });
+}
+
+function applyPageSize(size) {
+    const dt = $('#progressTable').DataTable();
+    dt.page.len(size).draw();
+    setActivePageSize(size);
+}
+
+function applyPreset(mode) {
+    document.getElementById('date_start').value = PRESETS[mode][0];
+    document.getElementById('date_end').value = PRESETS[mode][1];
+    updateProgression();
+    setActiveMode(mode);
+}
+
+function updateRaceStats() {
+    const dt = $('#progressTable').DataTable();
+    const raceCounts = {};
+    let total = 0;
+    let rowsData = dt.rows({ search: 'applied', order: 'applied' }).data().toArray();
+    const topN = dt.page.len();
+    rowsData = rowsData.slice(0, topN);
+    rowsData.forEach(row => {
+        const race = row[3]; // colonne Race
+        raceCounts[race] = (raceCounts[race] || 0) + 1;
+        total++;
+    });
+
+    let html = `<strong>Total joueurs affichés :</strong> ${total}<br><br>`;
+    for (let race in raceCounts) {
+        html += `${race} : <strong>${raceCounts[race]}</strong><br>`;
+    }
+    document.getElementById('raceStats').innerHTML = html;
+}
+
+$(document).ready(function() {
+    const dt = $('#progressTable').DataTable({
+        "pageLength": 10,
+        "lengthMenu": [10,25,50,100,200],
+        "order": [[6,"desc"]]
+    });
+
+    // Rendre la barre de recherche native capable de gérer le | comme OR (regex)
+    $('#progressTable_filter input[type="search"]').off()  // retire l'écoute par défaut
+    .on('input', function() {
+        const val = this.value.trim();
+        const dt = $('#progressTable').DataTable();
+        if (val.length === 0) {
+            dt.search('', false, false, true).draw();
+        } else {
+            // search(val, regex=true, smart=false, caseInsensitive=true)
+            dt.search(val, true, false, true).draw();
+        }
+    });
+
+
+    $('#progressTable_filter').prepend('<div style="color:#aaa; font-size:0.85em; margin-bottom:2px;">Recherche multiple avec | (ex: Alice|Bob)</div>');
+
+    // Boutons nombre de joueurs
+    document.querySelectorAll('#pageSizeButtons button').forEach(btn => {
+        btn.addEventListener('click', () => {
+            applyPageSize(parseInt(btn.dataset.size));
+        });
+    });
+
+    // Filtres serveurs & races
+    document.querySelectorAll('.server-filter, .race-filter').forEach(el => {
+        el.addEventListener('change', updateProgression);
+    });
+
+    // Sélecteurs de dates
+    document.getElementById('date_start').addEventListener('change', () => {
+        setActiveMode(null);
+        updateProgression();
+    });
+
+    document.getElementById('date_end').addEventListener('change', () => {
+        setActiveMode(null);
+        updateProgression();
+    });
+
+    // Boutons presets
+    ['last1', 'last7', 'last30', 'alltime'].forEach(mode => {
+        document.getElementById(mode).addEventListener('click', () => applyPreset(mode));
+    });
+
+    // Stats races à chaque redraw
+    $('#progressTable').on('draw.dt', function () {
+        updateRaceStats();
+    });
+
+    // État initial : la vue de la semaine est déjà dans le <tbody>
+    updateRaceStats();
+    setActiveMode('last7');
+    worker.postMessage({ type: 'init', manifest: new URL(MANIFEST_URL, location.href).href });
+    setActivePageSize(10);
+});
+
+function applyTheme(theme) {
+    document.body.setAttribute('data-theme', theme);
+    localStorage.setItem('theme', theme);
+
+    const btn = document.getElementById('themeToggle');
+    btn.textContent = theme === 'dark'
+        ? '☀️ Mode clair'
+        : '🌙 Mode sombre';
+}
+
+document.getElementById('themeToggle').addEventListener('click', () => {
+    const current = document.body.getAttribute('data-theme') || 'dark';
+    applyTheme(current === 'dark' ? 'light' : 'dark');
+});
+
+// Appliquer le thème sauvegardé au chargement
+const savedTheme = localStorage.getItem('theme') || 'dark';
+applyTheme(savedTheme);
+
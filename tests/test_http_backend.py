@@ -0,0 +1,131 @@
+import threading
+import unittest
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from rank_parser import RaceMatcher, parse_ranking
+from scrap_classement import SERVERS
+from tests.test_rank_parser import read_fixture
+
+try:
+    from http_backend import HttpBackend
+except ImportError:  # requests absent : backend HTTP indisponible
+    HttpBackend = None
+
+# =====================
+# CONNEXION HTTP
+# =====================
+# Un faux jeu sur 127.0.0.1 : portail avec formulaire et liste de royaumes,
+# page intermédiaire "Cliquez ici", puis serveur de jeu qui sert les pages
+# de classement enregistrées, sans charset dans l'en-tête Content-Type.
+
+LOGIN, PASSWORD = "vlad", "secret"
+SESSION = "sid=ok"
+
+PORTAL_PAGE = """<html><head><meta charset="utf-8"></head><body>
+<form action="/portal/login" method="post">
+  <select id="i_realm" name="realm">
+    <option value="201">UT1</option><option value="3">Necropolia II</option>
+  </select>
+  <input type="hidden" name="token" value="abc">
+  <input type="text" name="login"><input type="password" name="password">
+  <input type="checkbox" name="remember">
+  <input type="submit" value="OK">
+</form></body></html>"""
+
+CLICK_HERE_PAGE = """<html><body>Connexion réussie.
+<a href="/server/?a=main">Cliquez ici</a> pour continuer.</body></html>"""
+
+MAIN_PAGE = "<html><body><a href='?a=rank'>Classement</a></body></html>"
+
+class FakeGame(BaseHTTPRequestHandler):
+    realm = None      # royaume attendu par le portail
+    rank_fixture = None
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, body, cookie=None):
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")  # pas de charset, comme le jeu
+        self.send_header("Content-Length", str(len(payload)))
+        if cookie:
+            self.send_header("Set-Cookie", cookie)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def logged_in(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return "sid" in cookie and cookie["sid"].value == "ok"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/portal":
+            self.send(PORTAL_PAGE)
+        elif url.path == "/server/" and self.logged_in():
+            self.send(read_fixture(self.rank_fixture) if query.get("a") == ["rank"] else MAIN_PAGE)
+        else:
+            self.send(PORTAL_PAGE)  # session absente : retour au formulaire
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        fields = parse_qs(self.rfile.read(length).decode("utf-8"))
+        ok = (
+            fields.get("realm") == [self.realm]
+            and fields.get("login") == [LOGIN]
+            and fields.get("password") == [PASSWORD]
+            and fields.get("token") == ["abc"]
+            and "remember" not in fields
+        )
+        if ok:
+            self.send(CLICK_HERE_PAGE, cookie=SESSION + "; Path=/")
+        else:
+            self.send(PORTAL_PAGE)
+
+@unittest.skipIf(HttpBackend is None, "requests n'est pas installé")
+class HttpBackendTest(unittest.TestCase):
+    def start(self, code, fixture):
+        server = dict(next(s for s in SERVERS if s["code"] == code))
+        handler = type("Handler", (FakeGame,), {"realm": server["realm"], "rank_fixture": fixture})
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        self.addCleanup(httpd.server_close)
+        self.addCleanup(httpd.shutdown)
+
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+        server.update(portal=base + "/portal", server_url=base + "/server")
+        backend = HttpBackend(server)
+        self.addCleanup(backend.close)
+        return server, backend
+
+    def test_login_and_rank_page_fr(self):
+        server, backend = self.start("R1", "rank_fr.html")
+        self.assertTrue(backend.login(LOGIN, PASSWORD))
+        rows, _ = parse_ranking(backend.fetch_rank_page(1), RaceMatcher(server["races"]))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0].race, "CAPTEUR D’ESPRIT")
+
+    def test_rank_page_pl_decoded_from_meta_charset(self):
+        server, backend = self.start("R3", "rank_pl.html")
+        self.assertTrue(backend.login(LOGIN, PASSWORD))
+        html = backend.fetch_rank_page(1)
+        self.assertIn("ŁAPACZ MYŚLI", html)
+        rows, _ = parse_ranking(html, RaceMatcher(server["races"]))
+        self.assertEqual([r.name for r in rows][:2], ["Żmij", "Ssak Władca"])
+
+    def test_wrong_password(self):
+        _, backend = self.start("R1", "rank_fr.html")
+        self.assertFalse(backend.login(LOGIN, "faux"))
+
+    def test_realm_sent_through_select(self):
+        # Le portail n'accepte que le royaume de R3 : la connexion de R1 échoue
+        server, backend = self.start("R3", "rank_pl.html")
+        backend.server["realm"] = "201"
+        self.assertFalse(backend.login(LOGIN, PASSWORD))
+
+
+if __name__ == "__main__":
+    unittest.main()
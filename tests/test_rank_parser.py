@@ -0,0 +1,177 @@
+import glob
+import os
+import re
+import unittest
+
+from rank_parser import RaceMatcher, RankRow, parse_ranking, read_rank_page
+from scrap_classement import SERVERS
+
+# =====================
+# PARSING DU CLASSEMENT
+# =====================
+# rank_fr.html / rank_pl.html : pages écrites à la main d'après la structure
+# du jeu (R1 et R3), avec des cas limites. Les pages réelles enregistrées
+# avec BW_CAPTURE_DIR=tests/fixtures/captured sont vérifiées en plus.
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CAPTURED_DIR = os.path.join(FIXTURES_DIR, "captured")
+CAPTURED_NAME = re.compile(r"([A-Z]+\d+)_(\d+)\.html$")
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+def races_of(code):
+    return next(s["races"] for s in SERVERS if s["code"] == code)
+
+class FrRankPageTest(unittest.TestCase):
+    def setUp(self):
+        self.rows, self.rejected = parse_ranking(read_fixture("rank_fr.html"), RaceMatcher(races_of("R1")))
+
+    def test_rows(self):
+        self.assertEqual(self.rows, [
+            RankRow(1, "Vladimir", "CAPTEUR D’ESPRIT", 1843920),
+            RankRow(2, "Le Damné", "ABSORBEUR", 1722014),
+            RankRow(3, "Comte & Cultiste", "SEIGNEUR DES BÊTES", 1650333),
+            RankRow(4, "Seigneur des Ombres", "CULTISTE", 1498002),
+            RankRow(5, "Absorbeur", "DAMNÉ", 1399870),
+            RankRow(6, "Élise [NUIT]", "CAPTEUR D’ESPRIT", 1204551),
+        ])
+
+    def test_rejected_rows(self):
+        # Race inconnue, points illisibles : signalées, jamais devinées
+        self.assertEqual(self.rejected, [
+            "7. Morgane MAGE NOIR 1100200",
+            "8. Lucius CULTISTE n/a",
+        ])
+
+    def test_header_layout_and_scripts_ignored(self):
+        texts = [row.name for row in self.rows] + self.rejected
+        self.assertFalse(any("PLACE" in t or "Accueil" in t or "pas une ligne" in t for t in texts))
+
+class PlRankPageTest(unittest.TestCase):
+    def setUp(self):
+        self.rows, self.rejected = parse_ranking(read_fixture("rank_pl.html"), RaceMatcher(races_of("R3")))
+
+    def test_rows(self):
+        self.assertEqual(self.rows, [
+            RankRow(51, "Żmij", "ŁAPACZ MYŚLI", 954021),
+            RankRow(52, "Ssak Władca", "KULTYSTA", 950117),
+            RankRow(53, "Potępiony Łapacz", "WŁADCA ZWIERZĄT", 948870),
+            RankRow(54, "Kultysta", "POTĘPIONY", 901442),
+            RankRow(55, "Wiedźma z Łodzi", "SSAK", 899003),
+        ])
+
+    def test_rejected_rows(self):
+        # Premier mot d'une race à deux mots : pas une race
+        self.assertEqual(self.rejected, ["56. Bezimienny ŁAPACZ 880000"])
+
+    def test_fr_races_do_not_match(self):
+        rows, rejected = parse_ranking(read_fixture("rank_pl.html"), RaceMatcher(races_of("R1")))
+        self.assertEqual(rows, [])
+        self.assertEqual(len(rejected), 6)
+
+class PageMarkersTest(unittest.TestCase):
+    """En-tête du tableau et pager : ce qui distingue la fin du classement d'une page d'erreur"""
+
+    def read(self, html):
+        return read_rank_page(html, RaceMatcher(races_of("R1")))
+
+    def test_fixture(self):
+        page = self.read(read_fixture("rank_fr.html"))
+        self.assertTrue(page.has_header)
+        self.assertEqual(page.last_page, 2)
+
+    def test_empty_ranking_table(self):
+        page = self.read("<table><tr><th>PLACE</th><th>NOM</th><th>RACE</th><th>POINTS</th></tr></table>")
+        self.assertEqual((page.rows, page.rejected, page.has_header), ([], [], True))
+
+    def test_error_page(self):
+        page = self.read("<html><body><table><tr><th>Erreur</th><td>Session expirée</td></tr></table></body></html>")
+        self.assertEqual((page.has_header, page.last_page), (False, None))
+
+    def test_only_rank_links_count(self):
+        page = self.read('<a href="?a=rank&amp;page=3">3</a><a href="?a=forum&amp;page=90">90</a>')
+        self.assertEqual(page.last_page, 3)
+
+class OmittedEndTagsTest(unittest.TestCase):
+    """</tr> et </td> sont facultatifs en HTML : le jeu ne les écrit pas toujours"""
+
+    def parse(self, html):
+        return parse_ranking(html, RaceMatcher(races_of("R1")))
+
+    def test_rows_closed_by_next_row(self):
+        rows, rejected = self.parse(
+            "<table><tr><th>PLACE<th>NOM<th>RACE<th>POINTS"
+            "<tr><td>1.<td>Vladimir<td>CULTISTE<td>300"
+            "<tr><td>2.<td>Nyx<td>DAMNÉ<td>200"
+            "<tr><td>3.<td>Lucius<td>ABSORBEUR<td>100</table>"
+        )
+        self.assertEqual([r.position for r in rows], [1, 2, 3])
+        self.assertEqual(rejected, [])
+
+    def test_row_closed_by_section_end(self):
+        rows, _ = self.parse(
+            "<table><tbody><tr><td>1.<td>Vladimir<td>CULTISTE<td>300</tbody>"
+            "<tfoot><tr><td>Page 1</tfoot></table>"
+        )
+        self.assertEqual(rows, [RankRow(1, "Vladimir", "CULTISTE", 300)])
+
+    def test_nested_table_in_open_layout_row(self):
+        rows, _ = self.parse(
+            "<table class=layout><tr><td>Menu"
+            "<tr><td><table class=rank>"
+            "<tr><td>1.<td>Vladimir<td>CULTISTE<td>300"
+            "<tr><td>2.<td>Nyx<td>DAMNÉ<td>200"
+            "</table><p>1 2 3</table>"
+        )
+        self.assertEqual([r.name for r in rows], ["Vladimir", "Nyx"])
+
+    def test_truncated_document(self):
+        rows, _ = self.parse("<table><tr><td>1.<td>Vladimir<td>CULTISTE<td>300")
+        self.assertEqual(len(rows), 1)
+
+class CapturedPagesTest(unittest.TestCase):
+    """Pages réelles enregistrées avec BW_CAPTURE_DIR (ignoré s'il n'y en a pas)"""
+
+    def test_captured_pages(self):
+        paths = sorted(glob.glob(os.path.join(CAPTURED_DIR, "*_*.html")))
+        if not paths:
+            self.skipTest("aucune page enregistrée dans tests/fixtures/captured")
+        for path in paths:
+            code = CAPTURED_NAME.search(path).group(1)
+            with self.subTest(os.path.basename(path)):
+                with open(path, encoding="utf-8") as f:
+                    rows, rejected = parse_ranking(f.read(), RaceMatcher(races_of(code)))
+                self.assertTrue(rows)
+                self.assertEqual(rejected, [])
+                # Positions consécutives : aucune ligne perdue entre deux reconnues
+                positions = [r.position for r in rows]
+                self.assertEqual(positions, list(range(positions[0], positions[0] + len(rows))))
+
+class RaceMatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.matcher = RaceMatcher(races_of("R1"))
+
+    def test_race_read_from_the_right(self):
+        self.assertEqual(
+            self.matcher.match("12. Capteur d’Esprit Damné CAPTEUR D’ESPRIT 4200"),
+            RankRow(12, "Capteur d’Esprit Damné", "CAPTEUR D’ESPRIT", 4200),
+        )
+
+    def test_case_and_spacing(self):
+        self.assertEqual(
+            self.matcher.match("3.  Nyx   seigneur  des   bêtes  99"),
+            RankRow(3, "Nyx", "SEIGNEUR DES BÊTES", 99),
+        )
+
+    def test_name_required(self):
+        self.assertIsNone(self.matcher.match("4. CULTISTE 1000"))
+
+    def test_not_a_ranking_row(self):
+        self.assertIsNone(self.matcher.match("PLACE NOM RACE POINTS"))
+        self.assertIsNone(self.matcher.match(""))
+
+
+if __name__ == "__main__":
+    unittest.main()
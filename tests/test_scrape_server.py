@@ -0,0 +1,79 @@
+import unittest
+from html import escape
+from unittest import mock
+
+import fetch_scheduler
+import scrap_classement
+from scrap_classement import SERVERS, scrape_server
+
+# =====================
+# FIN DU CLASSEMENT (BW_PAGES=all)
+# =====================
+# Un faux backend sert un classement de `ladder` joueurs, 50 par page. La
+# fin n'est reconnue que sur un tableau vide ou grâce au pager : une page
+# d'erreur est réessayée, jamais prise pour la fin.
+
+SERVER = next(s for s in SERVERS if s["code"] == "R1")
+PAGE_SIZE = 50
+ERROR_PAGE = "<html><body>Session expirée, reconnectez-vous</body></html>"
+SETTINGS = {"backend": "http", "rate": 1000, "burst": 100, "concurrency": 4, "retries": 2}
+
+class FakeBackend:
+    max_concurrency = 4
+
+    def __init__(self, ladder, errors=None, pager=False):
+        self.ladder = ladder
+        self.errors = dict(errors or {})  # page -> nombre de pages d'erreur avant la bonne
+        self.pager = pager
+
+    def fetch_rank_page(self, page):
+        if self.errors.get(page):
+            self.errors[page] -= 1
+            return ERROR_PAGE
+        race = SERVER["races"][0]
+        first = (page - 1) * PAGE_SIZE + 1
+        rows = "".join(
+            f"<tr><td>{p}.</td><td>J{p}</td><td>{escape(race)}</td><td>{10 ** 6 - p}</td></tr>"
+            for p in range(first, min(page * PAGE_SIZE, self.ladder) + 1)
+        )
+        pager = ""
+        if self.pager:
+            last = -(-self.ladder // PAGE_SIZE)
+            pager = "".join(f'<a href="?a=rank&amp;page={n}">{n}</a>' for n in range(1, last + 1))
+        return f"<table><tr><th>PLACE</th><th>NOM</th><th>RACE</th><th>POINTS</th></tr>{rows}</table>{pager}"
+
+    def close(self):
+        pass
+
+class LadderEndTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(fetch_scheduler, "BACKOFF", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def scrape(self, backend):
+        pages = {}
+        with mock.patch.object(scrap_classement, "connect", return_value=backend):
+            last_page = scrape_server(SERVER, None, lambda page, rows: pages.update({page: rows}), SETTINGS)
+        return last_page, sum(len(rows) for rows in pages.values())
+
+    def test_short_last_page(self):
+        self.assertEqual(self.scrape(FakeBackend(230)), (5, 230))
+
+    def test_error_page_is_retried(self):
+        self.assertEqual(self.scrape(FakeBackend(230, errors={3: 1})), (5, 230))
+
+    def test_empty_table_after_full_last_page(self):
+        self.assertEqual(self.scrape(FakeBackend(200, errors={5: 1})), (4, 200))
+
+    def test_pager_marks_last_page(self):
+        # Au-delà de la dernière page, le jeu ne renvoie que des erreurs : le pager suffit
+        self.assertEqual(self.scrape(FakeBackend(200, errors={5: 99}, pager=True)), (4, 200))
+
+    def test_persistent_error_page_fails(self):
+        with self.assertRaises(Exception):
+            self.scrape(FakeBackend(200, errors={5: 99}))
+
+
+if __name__ == "__main__":
+    unittest.main()